@@ -4,20 +4,48 @@ Network Monitor Dashboard - Backend Server (Version Améliorée)
 Tableau de bord de monitoring réseau avec interface cyber-futuriste
 """
 
-from flask import Flask, render_template, jsonify
-from flask_socketio import SocketIO
-import psutil
+import os
+
+# Mode gevent: sockets, threads et subprocess doivent être patchés avant tout autre import
+if os.getenv('SERVER_MODE', 'threading') == 'gevent':
+    from gevent import monkey
+    monkey.patch_all()
+
+from flask import Flask, render_template, jsonify, request
+from flask_socketio import SocketIO, emit, join_room
 import subprocess
-import threading
 import time
 import re
 import json
-import os
 import logging
 from datetime import datetime, timedelta
 import socket
+import gzip
+import hashlib
+import shutil
+import sys
+import atexit
+import ctypes
+import signal
 from collections import deque
-from typing import Dict, List, Optional
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Modules communs (Python/netcommon), à côté du dossier de l'outil
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from arpsweep import create_arp_sweeper
+from bus import BusBroker, UnixSocketManager
+from journal import JournalFollower
+from netcommon.history import HistoryStore
+from netcommon.neighbours import NeighbourTable, normalize_mac
+from netcommon.oui import lookup_vendor
+from netcommon.passive import create_passive_listener
+from netcommon.resolver import ReverseResolver
+from sampler import MetricsSampler
+from scheduler import Scheduler
+from state import StateStore
+from wire import DEFAULT_FORMAT, WIRE_FORMATS, SnapshotCache, SocketJSON, negotiate, serialize
 
 # Configuration du logging
 logging.basicConfig(
@@ -35,16 +63,60 @@ class Config:
     MAX_LOGS = int(os.getenv('MAX_LOGS', '50'))
     ENABLE_SPEEDTEST = os.getenv('ENABLE_SPEEDTEST', 'true').lower() == 'true'
     PORT = int(os.getenv('PORT', '5000'))
+    DNS_WORKERS = int(os.getenv('DNS_WORKERS', '8'))
+    DNS_TTL = int(os.getenv('DNS_TTL', '3600'))
+    DNS_NEGATIVE_TTL = int(os.getenv('DNS_NEGATIVE_TTL', '300'))
+    SERVICES_INTERVAL = int(os.getenv('SERVICES_INTERVAL', '10'))
+    SCAN_TIMEOUT = int(os.getenv('SCAN_TIMEOUT', '30'))
+    SPEEDTEST_TIMEOUT = int(os.getenv('SPEEDTEST_TIMEOUT', '90'))
+    LOG_BUFFER = int(os.getenv('LOG_BUFFER', '5000'))
+    LOG_UNITS = [u for u in os.getenv('LOG_UNITS', '').split(',') if u]
+    LOG_PRIORITY = os.getenv('LOG_PRIORITY') or None
+    HISTORY_DB = os.getenv('HISTORY_DB', 'data/history.db')
+    HISTORY_RAW_HOURS = int(os.getenv('HISTORY_RAW_HOURS', '24'))
+    HISTORY_MINUTE_DAYS = int(os.getenv('HISTORY_MINUTE_DAYS', '30'))
+    HISTORY_HOUR_DAYS = int(os.getenv('HISTORY_HOUR_DAYS', '365'))
+    HISTORY_MAX_POINTS = int(os.getenv('HISTORY_MAX_POINTS', '2000'))
+    ARP_INTERFACE = os.getenv('ARP_INTERFACE') or None
+    ARP_MAX_PREFIX = int(os.getenv('ARP_MAX_PREFIX', '22'))
+    ARP_TIMEOUT = float(os.getenv('ARP_TIMEOUT', '0.3'))
+    PASSIVE_DISCOVERY = os.getenv('PASSIVE_DISCOVERY', 'true').lower() == 'true'
+    PASSIVE_DEVICE_TTL = int(os.getenv('PASSIVE_DEVICE_TTL', '600'))  # appareil vu passivement gardé (s)
+    SERVER_MODE = os.getenv('SERVER_MODE', 'threading')  # 'threading' (développement) ou 'gevent'
+    WEB_WORKERS = int(os.getenv('WEB_WORKERS', '1'))
+    MAX_CONNECTIONS = int(os.getenv('MAX_CONNECTIONS', '1000'))  # par processus web
+    PROCESS_ROLE = os.getenv('PROCESS_ROLE', 'leader')  # 'web': processus lancé par le leader
+    BUS_SOCKET = os.getenv('BUS_SOCKET', '/tmp/boatboard-bus.sock')
+    WORKER_CHECK_INTERVAL = int(os.getenv('WORKER_CHECK_INTERVAL', '5'))  # surveillance des processus web
+
+# Plusieurs processus web (gevent): un seul leader fait tourner les collecteurs,
+# l'état et les émissions passent par le bus local
+MULTI_PROCESS = Config.SERVER_MODE == 'gevent' and Config.WEB_WORKERS > 1
+IS_LEADER = Config.PROCESS_ROLE != 'web'
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = Config.SECRET_KEY
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
 
-# Variables globales
-network_data = {
+# Bus local: relais hébergé par le leader, processus web abonnés (répliques de l'état)
+bus_manager = None
+if MULTI_PROCESS:
+    if IS_LEADER:
+        BusBroker(Config.BUS_SOCKET).start()
+    bus_manager = UnixSocketManager(
+        Config.BUS_SOCKET,
+        on_state=None if IS_LEADER else (lambda snapshot: state.load(snapshot))
+    )
+
+# SocketJSON: les messages pré-sérialisés (RawJSON) sont émis sans être réencodés
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=Config.SERVER_MODE,
+                    json=SocketJSON, client_manager=bus_manager)
+
+# État versionné: les clients reçoivent un instantané puis des deltas
+state = StateStore({
     'devices': [],
     'speedtest': {'download': 0, 'upload': 0, 'ping': 0, 'last_update': 'Jamais'},
     'cpu': 0,
+    'cpu_per_core': [],
     'ram': 0,
     'disk': 0,
     'network_io': {'sent': 0, 'recv': 0},
@@ -52,15 +124,68 @@ network_data = {
     'hostname': '',
     'running_services': [],
     'logs': []
-}
+}, max_logs=Config.MAX_LOGS)
+
+# Table des voisins du noyau, relue une fois par cycle de scan
+neighbours = NeighbourTable()
+
+# Balayage ARP natif (AF_PACKET); None sans CAP_NET_RAW -> arp-scan ou table ARP
+arp_sweeper = create_arp_sweeper(Config.ARP_INTERFACE, max_prefix=Config.ARP_MAX_PREFIX) if IS_LEADER else None
+
+# Écoute passive ARP/mDNS/DHCP, démarrée avec les collecteurs
+passive_listener = None
+
+# Résolveur DNS inverse: cache LRU, jamais bloquant pour la boucle de mise à jour
+resolver = ReverseResolver(
+    workers=Config.DNS_WORKERS,
+    positive_ttl=Config.DNS_TTL,
+    negative_ttl=Config.DNS_NEGATIVE_TTL
+)
+
+# Suivi continu de journald (un seul processus, tampon circulaire)
+journal = JournalFollower(
+    max_entries=Config.LOG_BUFFER,
+    units=Config.LOG_UNITS,
+    priority=Config.LOG_PRIORITY,
+    backlog=Config.MAX_LOGS
+)
+
+def run_in_os_thread(func, *args):
+    """Appel C bloquant (SQLite) dans le pool de threads système de gevent:
+    la boucle d'événements continue de servir les websockets"""
+    from gevent import get_hub
+    return get_hub().threadpool.apply(func, args)
+
+# Historique des métriques et de la présence des appareils (SQLite WAL)
+history = HistoryStore(
+    Config.HISTORY_DB,
+    retention={
+        0: Config.HISTORY_RAW_HOURS * 3600,
+        60: Config.HISTORY_MINUTE_DAYS * 86400,
+        3600: Config.HISTORY_HOUR_DAYS * 86400
+    },
+    maintenance_interval=60 if IS_LEADER else float('inf'),  # agrégation faite par le leader seul
+    run_blocking=run_in_os_thread if Config.SERVER_MODE == 'gevent' else None
+)
 
 _cache = {
+    'known_devices': set(),
+    'log_cursor': 0,
     'last_speedtest': None,
     'speedtest_data': None,
-    'devices_scan_running': False,
-    'last_network_io': None
+    'devices_scan_running': False
 }
 
+# Instantané sérialisé (et compressé) une fois par version, partagé par
+# /api/data et les instantanés Socket.IO
+snapshots = SnapshotCache(state)
+
+# Format de flux de chaque client connecté (sid -> 'json' / 'packed' / 'msgpack')
+wire_clients: Dict[str, str] = {}
+
+# Échantillonneur CPU/réseau non bloquant (deltas entre ticks)
+sampler = MetricsSampler()
+
 def get_server_info() -> Dict[str, str]:
     """Récupère les informations du serveur"""
     info = {'ip': 'Indisponible', 'hostname': 'Indisponible'}
@@ -87,51 +212,107 @@ def get_server_info() -> Dict[str, str]:
     
     return info
 
+# Préfixes OUI (24 bits) -> type, indexés une seule fois au chargement
+_MAC_PREFIXES = {
+    'vm': ['00:50:56', '00:0C:29', '00:05:69', '08:00:27', '52:54:00'],
+    'raspberry': ['B8:27:EB', 'DC:A6:32', 'E4:5F:01', 'D8:3A:DD', '28:CD:C1'],
+    'mobile': ['AC:DE:48', '00:11:32', '5C:CF:7F', '54:E4:BD', '00:1F:5B'],
+    'nas': ['00:11:32', '00:08:9B', '00:1B:63'],
+}
+_MAC_PREFIX_TYPES: Dict[str, str] = {}
+for _type, _prefixes in _MAC_PREFIXES.items():
+    for _prefix in _prefixes:
+        _MAC_PREFIX_TYPES.setdefault(_prefix.replace(':', ''), _type)
+
+@lru_cache(maxsize=1024)
+def _vendor_type(vendor_lower: str) -> Optional[str]:
+    """Type déduit du nom du fabricant"""
+    if any(x in vendor_lower for x in ['apple', 'iphone', 'samsung', 'huawei', 'xiaomi']):
+        return 'mobile'
+    elif 'raspberry' in vendor_lower:
+        return 'raspberry'
+    elif any(x in vendor_lower for x in ['synology', 'qnap', 'netgear']):
+        return 'nas'
+    elif any(x in vendor_lower for x in ['vmware', 'virtualbox']):
+        return 'vm'
+    return None
+
 def detect_device_type(mac: str, vendor: str = '') -> str:
     """Détecte le type d'appareil"""
-    mac_upper = mac.upper()
-    vendor_lower = vendor.lower()
-    
-    if vendor_lower:
-        if any(x in vendor_lower for x in ['apple', 'iphone', 'samsung', 'huawei', 'xiaomi']):
-            return 'mobile'
-        elif 'raspberry' in vendor_lower:
-            return 'raspberry'
-        elif any(x in vendor_lower for x in ['synology', 'qnap', 'netgear']):
-            return 'nas'
-        elif any(x in vendor_lower for x in ['vmware', 'virtualbox']):
-            return 'vm'
-    
-    mac_prefixes = {
-        'vm': ['00:50:56', '00:0C:29', '00:05:69', '08:00:27', '52:54:00'],
-        'raspberry': ['B8:27:EB', 'DC:A6:32', 'E4:5F:01', 'D8:3A:DD', '28:CD:C1'],
-        'mobile': ['AC:DE:48', '00:11:32', '5C:CF:7F', '54:E4:BD', '00:1F:5B'],
-        'nas': ['00:11:32', '00:08:9B', '00:1B:63'],
-    }
-    
-    for device_type, prefixes in mac_prefixes.items():
-        if any(mac_upper.startswith(p) for p in prefixes):
+    if vendor:
+        device_type = _vendor_type(vendor.lower())
+        if device_type:
             return device_type
     
-    return 'computer'
+    oui_prefix = mac.upper().replace(':', '').replace('-', '')[:6]
+    return _MAC_PREFIX_TYPES.get(oui_prefix, 'computer')
 
-def get_hostname_safe(ip: str) -> str:
-    """Récupère le hostname"""
-    try:
-        return socket.gethostbyaddr(ip)[0]
-    except:
-        return ip
+def get_hostname_safe(ip: str, mac: Optional[str] = None) -> str:
+    """Récupère le hostname depuis le cache (résolution en arrière-plan sinon)"""
+    hostname = resolver.lookup_nowait(ip, default=ip)
+    if hostname == ip and mac and passive_listener is not None:
+        # Pas de DNS inverse: nom annoncé en DHCP/mDNS s'il est connu
+        return passive_listener.hostname(mac) or ip
+    return hostname
+
+def passive_device_entry(device: Dict) -> Dict:
+    """Appareil de la découverte passive au format du scan"""
+    vendor = lookup_vendor(device['mac']) or ''
+    return {
+        'ip': device['ip'],
+        'mac': device['mac'],
+        'vendor': vendor,
+        'type': detect_device_type(device['mac'], vendor),
+        'hostname': device['hostname'] or get_hostname_safe(device['ip'])
+    }
+
+def on_passive_device(device: Dict):
+    """Appareil nouveau ou modifié vu passivement: publié sans attendre le scan"""
+    state.upsert_device(passive_device_entry(device))
+
+def merge_passive_devices(devices: List[Dict]) -> List[Dict]:
+    """Complète le scan avec les appareils vus passivement récemment
+
+    Sans cela, le scan suivant (set_devices) retirerait un appareil qui ne
+    répond pas aux sondes mais reste actif sur le segment.
+    """
+    if passive_listener is None:
+        return devices
+    scanned = {device['mac'] for device in devices}
+    return devices + [passive_device_entry(device)
+                      for device in passive_listener.recent(Config.PASSIVE_DEVICE_TTL)
+                      if device['mac'] not in scanned]
 
 def get_network_devices() -> List[Dict]:
     """Scanne le réseau"""
     if _cache['devices_scan_running']:
-        return network_data.get('devices', [])
+        return state.get('devices')
     
     _cache['devices_scan_running'] = True
     devices = []
     
     try:
+        if arp_sweeper is not None:
+            try:
+                for ip, (mac, rtt) in arp_sweeper.sweep(timeout=Config.ARP_TIMEOUT).items():
+                    vendor = lookup_vendor(mac) or ''
+                    devices.append({
+                        'ip': ip,
+                        'mac': mac,
+                        'vendor': vendor,
+                        'type': detect_device_type(mac, vendor),
+                        'hostname': get_hostname_safe(ip, mac),
+                        'rtt': rtt
+                    })
+                logger.info(f"balayage ARP: {len(devices)} appareils")
+                return devices
+            except OSError as e:
+                logger.error(f"Erreur balayage ARP: {e}")
+        
+        # Repli optionnel: arp-scan s'il est installé
         try:
+            if not shutil.which('arp-scan'):
+                raise FileNotFoundError('arp-scan')
             result = subprocess.run(['arp-scan', '--localnet', '--retry=3'], 
                                   capture_output=True, text=True, timeout=15)
             
@@ -145,7 +326,7 @@ def get_network_devices() -> List[Dict]:
                             'mac': mac.lower(),
                             'vendor': vendor.strip(),
                             'type': detect_device_type(mac, vendor),
-                            'hostname': get_hostname_safe(ip)
+                            'hostname': get_hostname_safe(ip, mac.lower())
                         })
                 if devices:
                     logger.info(f"arp-scan: {len(devices)} appareils")
@@ -154,23 +335,18 @@ def get_network_devices() -> List[Dict]:
         except:
             pass
         
-        result = subprocess.run(['arp', '-a'], capture_output=True, text=True, timeout=5)
-        
-        if result.returncode == 0:
-            for line in result.stdout.split('\n'):
-                match = re.search(r'\(([0-9.]+)\)\s+at\s+([0-9a-f:]+)', line, re.IGNORECASE)
-                if match:
-                    ip, mac = match.groups()
-                    mac = mac.lower()
-                    if mac != '(incomplete)' and not any(d['mac'] == mac for d in devices):
-                        devices.append({
-                            'ip': ip,
-                            'mac': mac,
-                            'vendor': '',
-                            'type': detect_device_type(mac),
-                            'hostname': get_hostname_safe(ip)
-                        })
-            logger.info(f"arp: {len(devices)} appareils")
+        # Repli passif: table ARP du noyau, lue en une fois
+        for ip, mac in neighbours.refresh().items():
+            if not any(d['mac'] == mac for d in devices):
+                vendor = lookup_vendor(mac) or ''
+                devices.append({
+                    'ip': ip,
+                    'mac': mac,
+                    'vendor': vendor,
+                    'type': detect_device_type(mac, vendor),
+                    'hostname': get_hostname_safe(ip, mac)
+                })
+        logger.info(f"table ARP: {len(devices)} appareils")
     
     except Exception as e:
         logger.error(f"Erreur scan: {e}")
@@ -222,24 +398,10 @@ def run_speedtest() -> Dict:
 def get_system_resources() -> Dict:
     """Ressources système"""
     try:
-        cpu = psutil.cpu_percent(interval=1)
-        ram = psutil.virtual_memory().percent
-        disk = psutil.disk_usage('/').percent
-        net_io = psutil.net_io_counters()
-        
-        network_speed = {'sent': 0, 'recv': 0}
-        if _cache['last_network_io']:
-            sent_diff = net_io.bytes_sent - _cache['last_network_io'].bytes_sent
-            recv_diff = net_io.bytes_recv - _cache['last_network_io'].bytes_recv
-            network_speed['sent'] = round((sent_diff * 8) / 2_000_000, 2)
-            network_speed['recv'] = round((recv_diff * 8) / 2_000_000, 2)
-        
-        _cache['last_network_io'] = net_io
-        
-        return {'cpu': cpu, 'ram': ram, 'disk': disk, 'network_io': network_speed}
+        return sampler.sample()
     except Exception as e:
         logger.error(f"Erreur ressources: {e}")
-        return {'cpu': 0, 'ram': 0, 'disk': 0, 'network_io': {'sent': 0, 'recv': 0}}
+        return {'cpu': 0, 'cpu_per_core': [], 'ram': 0, 'disk': 0, 'network_io': {'sent': 0, 'recv': 0}}
 
 def get_running_services() -> List[str]:
     """Services actifs"""
@@ -259,96 +421,335 @@ def get_running_services() -> List[str]:
     
     return services
 
-def get_journalctl_logs(lines: int = 50) -> List[str]:
-    """Logs journalctl"""
-    logs = []
-    try:
-        result = subprocess.run(['journalctl', '-n', str(lines), '--no-pager', '-o', 'short-iso'],
-                              capture_output=True, text=True, timeout=5)
-        
-        if result.returncode == 0:
-            logs = [line for line in result.stdout.split('\n') if line.strip()]
-    except Exception as e:
-        logger.error(f"Erreur logs: {e}")
-    
-    return logs[-Config.MAX_LOGS:]
+# Collecteurs indépendants: chacun à sa cadence, dans son propre thread
+scheduler = Scheduler()
+
+def collect_resources():
+    resources = get_system_resources()
+    state.update(resources)
+    history.record_many({
+        'cpu': resources['cpu'],
+        'ram': resources['ram'],
+        'disk': resources['disk'],
+        'net_sent': resources['network_io']['sent'],
+        'net_recv': resources['network_io']['recv']
+    })
 
-def update_network_data():
-    """Thread de mise à jour"""
-    global network_data
-    update_counter = 0
+def collect_logs():
+    """Pousse uniquement les lignes reçues depuis le dernier passage"""
+    _cache['log_cursor'], lines = journal.since(_cache['log_cursor'], limit=Config.MAX_LOGS)
+    state.append_logs(lines)
+
+def collect_devices():
+    devices = merge_passive_devices(get_network_devices())
+    # Le RTT change à chaque balayage: historisé seulement, sinon chaque
+    # appareil serait rediffusé à chaque passage
+    rtts = {device['mac']: device.pop('rtt', None) for device in devices}
+    state.set_devices(devices)
     
+    # Présence: 1 pour les appareils vus, 0 pour les appareils connus absents
+    now = time.time()
+    present = {d['mac'] for d in devices}
+    _cache['known_devices'] |= present
+    for device in devices:
+        history.record(f"device.{device['mac']}.up", 1, now)
+        history.record(f"device.{device['mac']}.rtt", rtts[device['mac']], now)
+    for mac in _cache['known_devices'] - present:
+        history.record(f"device.{mac}.up", 0, now)
+
+def collect_services():
+    state.update({'running_services': get_running_services()})
+
+def collect_speedtest():
+    previous = _cache['last_speedtest']
+    speedtest_result = run_speedtest()
+    speedtest_result['last_update'] = datetime.now().strftime('%H:%M:%S')
+    state.update({'speedtest': speedtest_result})
+    if _cache['last_speedtest'] != previous:
+        history.record_many({
+            'speedtest.download': speedtest_result['download'],
+            'speedtest.upload': speedtest_result['upload'],
+            'speedtest.ping': speedtest_result['ping']
+        })
+
+def broadcast():
+    """Diffuse uniquement ce qui a changé depuis la version précédente"""
+    delta = state.commit()
+    if delta:
+        if bus_manager is not None:
+            # Répliques des processus web à jour avant l'arrivée du delta
+            bus_manager.publish_state(state.snapshot())
+        # Encodé une fois par format utilisé, diffusé à la room correspondante
+        # (tous les formats si des clients sont connectés à d'autres processus)
+        formats = WIRE_FORMATS if MULTI_PROCESS else set(wire_clients.values())
+        for wire_format in formats:
+            socketio.emit('delta', serialize(delta, wire_format), to=f'wire:{wire_format}')
+
+def start_collectors():
+    """Enregistre et démarre les collecteurs"""
+    global passive_listener
     server_info = get_server_info()
-    network_data['server_ip'] = server_info['ip']
-    network_data['hostname'] = server_info['hostname']
+    state.update({'server_ip': server_info['ip'], 'hostname': server_info['hostname']})
     
-    while True:
-        try:
-            resources = get_system_resources()
-            network_data.update(resources)
-            network_data['logs'] = get_journalctl_logs()
-            
-            if update_counter % 5 == 0:
-                network_data['devices'] = get_network_devices()
-                network_data['running_services'] = get_running_services()
-            
-            if update_counter % 150 == 0:
-                speedtest_result = run_speedtest()
-                speedtest_result['last_update'] = datetime.now().strftime('%H:%M:%S')
-                network_data['speedtest'] = speedtest_result
-            
-            socketio.emit('update', network_data)
-            
-            update_counter = (update_counter + 1) % 1000
-            time.sleep(Config.UPDATE_INTERVAL)
-            
-        except Exception as e:
-            logger.error(f"Erreur update: {e}")
-            time.sleep(5)
+    journal.start()
+    if Config.PASSIVE_DISCOVERY:
+        passive_listener = create_passive_listener(Config.ARP_INTERFACE, on_change=on_passive_device)
+    scheduler.add('resources', collect_resources, Config.UPDATE_INTERVAL, timeout=Config.UPDATE_INTERVAL)
+    scheduler.add('logs', collect_logs, Config.UPDATE_INTERVAL)
+    scheduler.add('devices', collect_devices, Config.SCAN_INTERVAL,
+                  timeout=Config.SCAN_TIMEOUT, jitter=Config.SCAN_INTERVAL * 0.1)
+    scheduler.add('services', collect_services, Config.SERVICES_INTERVAL,
+                  timeout=5, jitter=Config.SERVICES_INTERVAL * 0.1)
+    if Config.ENABLE_SPEEDTEST:
+        scheduler.add('speedtest', collect_speedtest, Config.SPEEDTEST_INTERVAL,
+                      timeout=Config.SPEEDTEST_TIMEOUT, jitter=10)
+    scheduler.add('broadcast', broadcast, Config.UPDATE_INTERVAL)
+    scheduler.start()
+
+# Séries exposées par défaut par /api/metrics
+METRIC_SERIES = ['cpu', 'ram', 'disk', 'net_sent', 'net_recv']
+# Pas automatiques (secondes): ~300 points quelle que soit la plage
+NICE_STEPS = (10, 30, 60, 300, 900, 3600, 21600, 86400)
+_DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+_MAC_RE = re.compile(r'^[0-9a-f]{1,2}([:-][0-9a-f]{1,2}){5}$', re.IGNORECASE)
+
+def parse_time(value: Optional[str], default: float, now: float) -> float:
+    """Horodatage epoch ou durée relative à maintenant ('24h', '30m', '7d')"""
+    if not value:
+        return default
+    unit = value[-1].lower()
+    if unit in _DURATION_UNITS:
+        return now - float(value[:-1]) * _DURATION_UNITS[unit]
+    return float(value)
+
+def history_range() -> Tuple[int, int, int]:
+    """Plage (from, to, step) de la requête, alignée sur le pas"""
+    now = time.time()
+    end = parse_time(request.args.get('to'), now, now)
+    start = parse_time(request.args.get('from'), end - 86400, now)
+    if start >= end:
+        raise ValueError('from doit précéder to')
+    step = request.args.get('step')
+    if step:
+        step = int(step)
+    else:
+        step = next((s for s in NICE_STEPS if (end - start) / s <= 300), NICE_STEPS[-1])
+    if step <= 0 or (end - start) / step > Config.HISTORY_MAX_POINTS:
+        raise ValueError('pas invalide ou trop de points')
+    start = int(start) - int(start) % step
+    end = int(end) - int(end) % step + step  # inclut le bucket en cours
+    return start, end, step
+
+def json_response(body: bytes, etag: str, live: bool,
+                  compressed: Optional[Callable[[str], Optional[bytes]]] = None):
+    """Réponse JSON avec ETag (If-None-Match -> 304) et compression br/gzip"""
+    response = app.response_class(body, mimetype='application/json')
+    # ETag faible: identique pour les variantes compressée et non compressée
+    response.set_etag(etag, weak=True)
+    if live:
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.max_age = 300
+    response = response.make_conditional(request)
+    response.vary.add('Accept-Encoding')
+    if response.status_code == 200 and len(body) > 1024:
+        for encoding in ('br', 'gzip'):
+            if encoding not in request.accept_encodings:
+                continue
+            if compressed is not None:
+                data = compressed(encoding)
+            else:
+                data = gzip.compress(body, compresslevel=6) if encoding == 'gzip' else None
+            if data is not None:
+                response.set_data(data)
+                response.headers['Content-Encoding'] = encoding
+                break
+    return response
+
+def cached_json(payload: Dict, live: bool):
+    """Réponse JSON d'un calcul ponctuel, ETag dérivé du contenu"""
+    body = json.dumps(payload, separators=(',', ':')).encode()
+    return json_response(body, hashlib.sha1(body).hexdigest(), live)
+
+def history_response(series: List[str]):
+    try:
+        start, end, step = history_range()
+    except ValueError as e:
+        return jsonify({'error': f'paramètre invalide: {e}'}), 400
+    payload = {
+        'from': start,
+        'to': end,
+        'step': step,
+        'series': {name: history.query(name, start, end, step) for name in series}
+    }
+    return cached_json(payload, live=end > time.time() - step)
 
 @app.route('/')
 def index():
-    return render_template('dashboard.html')
+    # Plusieurs processus: WebSocket seul (le long-polling exigerait des sessions collantes)
+    transports = ['websocket'] if MULTI_PROCESS else ['polling', 'websocket']
+    return render_template('dashboard.html', socket_transports=transports)
 
 @app.route('/api/data')
 def get_data():
-    return jsonify(network_data)
+    """Dernière version publiée: sérialisée et compressée une fois, 304 si inchangée"""
+    entry = snapshots.get('json')
+    return json_response(entry.body, entry.etag, live=True, compressed=entry.compressed)
+
+@app.route('/api/logs')
+def get_logs():
+    """Logs du tampon, filtrés par unité et priorité (?unit=&priority=&limit=)"""
+    try:
+        limit = min(int(request.args.get('limit', Config.MAX_LOGS)), Config.LOG_BUFFER)
+        priority = request.args.get('priority')
+        max_priority = int(priority) if priority is not None else None
+    except ValueError:
+        return jsonify({'error': 'paramètre invalide'}), 400
+    if not IS_LEADER:
+        # journald n'est suivi que par le leader: dernières lignes de l'état répliqué
+        return jsonify({'logs': state.get('logs')[-limit:]})
+    lines = journal.tail(limit, unit=request.args.get('unit'), max_priority=max_priority)
+    return jsonify({'logs': lines})
+
+@app.route('/api/metrics')
+def get_metrics():
+    """Historique agrégé (?from=&to=&step=&series=cpu,ram): buckets min/max/avg"""
+    series = [name for name in request.args.get('series', '').split(',') if name]
+    return history_response(series or METRIC_SERIES)
+
+@app.route('/api/devices/<mac>/history')
+def get_device_history(mac):
+    """Disponibilité (moyenne de 'up') et RTT d'un appareil"""
+    if not _MAC_RE.match(mac):
+        return jsonify({'error': 'adresse MAC invalide'}), 400
+    mac = normalize_mac(mac)
+    return history_response([f'device.{mac}.up', f'device.{mac}.rtt'])
 
 @app.route('/api/health')
 def health():
-    return jsonify({'status': 'ok', 'timestamp': datetime.now().isoformat()})
+    return jsonify({
+        'status': 'ok',
+        'timestamp': datetime.now().isoformat(),
+        'role': Config.PROCESS_ROLE,
+        'pid': os.getpid(),
+        'collectors': scheduler.stats(),
+        'clients': {f: list(wire_clients.values()).count(f) for f in set(wire_clients.values())}
+    })
 
 @socketio.on('connect')
-def handle_connect():
-    logger.info('Client connecté')
-    socketio.emit('update', network_data)
+def handle_connect(auth=None):
+    """Format négocié à la connexion: io({auth: {wire: 'packed'}}) ou ?wire="""
+    requested = (auth or {}).get('wire') or request.args.get('wire')
+    wire_format = negotiate(requested)
+    wire_clients[request.sid] = wire_format
+    join_room(f'wire:{wire_format}')
+    logger.info(f'Client connecté ({wire_format})')
+    # Client local: émis directement, sans passer l'instantané par le bus
+    emit('snapshot', snapshots.get(wire_format).message, ignore_queue=True)
+
+@socketio.on('resync')
+def handle_resync():
+    """Le client a manqué une version: renvoie l'instantané complet"""
+    emit('snapshot', snapshots.get(wire_clients.get(request.sid, DEFAULT_FORMAT)).message,
+         ignore_queue=True)
 
 @socketio.on('disconnect')
 def handle_disconnect():
+    wire_clients.pop(request.sid, None)
     logger.info('Client déconnecté')
 
-if __name__ == '__main__':
-    logger.info("=" * 60)
-    logger.info("Network Monitor Dashboard")
-    logger.info("=" * 60)
-    
-    server_info = get_server_info()
-    network_data['server_ip'] = server_info['ip']
-    network_data['hostname'] = server_info['hostname']
-    network_data['devices'] = get_network_devices()
-    network_data['running_services'] = get_running_services()
-    
-    if Config.ENABLE_SPEEDTEST:
-        logger.info("Speedtest initial...")
-        speedtest_result = run_speedtest()
-        speedtest_result['last_update'] = datetime.now().strftime('%H:%M:%S')
-        network_data['speedtest'] = speedtest_result
+web_workers: List[subprocess.Popen] = []
+web_workers_stopping = False
+
+def spawn_web_worker() -> subprocess.Popen:
+    """Processus web supplémentaire: même script, sans collecteurs"""
+    return subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__)],
+        env=dict(os.environ, PROCESS_ROLE='web', LEADER_PID=str(os.getpid()))
+    )
+
+def supervise_web_workers():
+    """Relance les processus web terminés (plantage, OOM...) tant que le leader tourne"""
+    while not web_workers_stopping:
+        for index, worker in enumerate(web_workers):
+            code = worker.poll()
+            if code is not None and not web_workers_stopping:
+                logger.warning(f"Processus web {worker.pid} terminé (code {code}), relancé")
+                web_workers[index] = spawn_web_worker()
+        socketio.sleep(Config.WORKER_CHECK_INTERVAL)
+
+def stop_web_workers():
+    global web_workers_stopping
+    web_workers_stopping = True
+    for worker in web_workers:
+        worker.terminate()
+
+def handle_stop_signal(signum, frame):
+    """SIGTERM (docker stop, systemd) / SIGINT: atexit seul ne s'exécute pas sur SIGTERM"""
+    logger.info(f"Signal {signum} reçu, arrêt")
+    stop_web_workers()
+    sys.exit(0)
+
+PR_SET_PDEATHSIG = 1
+
+def exit_with_leader():
+    """Processus web: s'arrête quand le leader disparaît (sinon il garderait le
+    port SO_REUSEPORT et servirait un état figé)"""
+    leader_pid = int(os.environ.get('LEADER_PID', os.getppid()))
+    try:
+        # Linux: SIGTERM envoyé par le noyau à la mort du parent
+        ctypes.CDLL(None, use_errno=True).prctl(PR_SET_PDEATHSIG, signal.SIGTERM)
+    except (OSError, AttributeError):
+        pass
+    # Repli (et leader mort avant le prctl): le parent a changé
+    while os.getppid() == leader_pid:
+        socketio.sleep(Config.WORKER_CHECK_INTERVAL)
+    logger.warning(f"Leader {leader_pid} disparu, arrêt du processus web")
+    os._exit(0)
+
+def serve_production():
+    """Serveur gevent: une greenlet par connexion, au plus MAX_CONNECTIONS par processus"""
+    from gevent import pool, pywsgi
+    from geventwebsocket.handler import WebSocketHandler
     
-    update_thread = threading.Thread(target=update_network_data, daemon=True)
-    update_thread.start()
+    signal.signal(signal.SIGTERM, handle_stop_signal)
+    signal.signal(signal.SIGINT, handle_stop_signal)
+    if IS_LEADER:
+        start_collectors()
+        for _ in range(1, Config.WEB_WORKERS):
+            web_workers.append(spawn_web_worker())
+        atexit.register(stop_web_workers)
+        if web_workers:
+            socketio.start_background_task(supervise_web_workers)
+    else:
+        socketio.start_background_task(exit_with_leader)
+    if bus_manager is not None:
+        # Abonnement au bus dès le démarrage: python-socketio ne l'initialise
+        # qu'à la première connexion, la réplique resterait vide jusque-là
+        socketio.server.manager_initialized = True
+        bus_manager.initialize()
     
-    logger.info(f"Serveur: http://0.0.0.0:{Config.PORT}")
-    logger.info(f"IP: {server_info['ip']}")
-    logger.info("=" * 60)
+    # SO_REUSEPORT: le noyau répartit les nouvelles connexions entre les processus
+    listener = socket.create_server(('0.0.0.0', Config.PORT), backlog=1024, reuse_port=MULTI_PROCESS)
+    server = pywsgi.WSGIServer(listener, app, handler_class=WebSocketHandler,
+                               spawn=pool.Pool(Config.MAX_CONNECTIONS), log=None)
+    logger.info(f"Processus {Config.PROCESS_ROLE} (pid {os.getpid()}): gevent, "
+                f"{Config.MAX_CONNECTIONS} connexions max")
+    server.serve_forever()
+
+if __name__ == '__main__':
+    if IS_LEADER:
+        logger.info("=" * 60)
+        logger.info("Network Monitor Dashboard")
+        logger.info("=" * 60)
+        logger.info(f"Serveur: http://0.0.0.0:{Config.PORT} ({Config.SERVER_MODE}, "
+                    f"{Config.WEB_WORKERS} processus web)")
+        logger.info("=" * 60)
     
-    socketio.run(app, host='0.0.0.0', port=Config.PORT, debug=False, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    if Config.SERVER_MODE == 'gevent':
+        serve_production()
+    else:
+        # Le speedtest initial tourne dans son collecteur sans retarder le démarrage
+        start_collectors()
+        logger.info(f"IP: {state.get('server_ip')}")
+        socketio.run(app, host='0.0.0.0', port=Config.PORT, debug=False, allow_unsafe_werkzeug=True)
\ No newline at end of file
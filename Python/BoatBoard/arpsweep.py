@@ -0,0 +1,146 @@
+"""
+Balayage ARP natif sur socket AF_PACKET (Linux, CAP_NET_RAW)
+Une requête ARP par adresse du préfixe local, réponses collectées dans une
+seule boucle de réception: trouve aussi les hôtes qui ignorent l'ICMP, sans
+binaire externe (arp-scan).
+"""
+
+import fcntl
+import ipaddress
+import logging
+import select
+import socket
+import struct
+import time
+from typing import Dict, Optional, Tuple
+
+from netcommon.neighbours import default_interface
+
+logger = logging.getLogger(__name__)
+
+ETH_P_ARP = 0x0806
+ETH_P_IP = 0x0800
+ARP_REQUEST = 1
+ARP_REPLY = 2
+BROADCAST = b'\xff' * 6
+
+# ioctl Linux (linux/sockios.h)
+SIOCGIFADDR = 0x8915
+SIOCGIFNETMASK = 0x891b
+SIOCGIFHWADDR = 0x8927
+
+ARP_FORMAT = struct.Struct('!6s6sHHHBBH6s4s6s4s')  # en-tête Ethernet + ARP
+
+
+def _ioctl(sock: socket.socket, request: int, interface: str) -> bytes:
+    return fcntl.ioctl(sock.fileno(), request, struct.pack('256s', interface[:15].encode()))
+
+
+def interface_info(interface: str) -> Tuple[bytes, ipaddress.IPv4Interface]:
+    """Adresse MAC et adresse IPv4/préfixe de l'interface"""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        mac = _ioctl(sock, SIOCGIFHWADDR, interface)[18:24]
+        ip = socket.inet_ntoa(_ioctl(sock, SIOCGIFADDR, interface)[20:24])
+        netmask = socket.inet_ntoa(_ioctl(sock, SIOCGIFNETMASK, interface)[20:24])
+    return mac, ipaddress.ip_interface(f"{ip}/{netmask}")
+
+
+def format_mac(raw: bytes) -> str:
+    return ':'.join(f'{b:02x}' for b in raw)
+
+
+class ArpSweeper:
+    """Requêtes ARP en rafale et réception groupée sur une socket AF_PACKET"""
+
+    def __init__(self, interface: Optional[str] = None, rate: int = 2000,
+                 max_prefix: int = 22):
+        self.interface = interface or default_interface()
+        if not self.interface:
+            raise OSError("aucune interface par défaut")
+        self.rate = rate  # trames par seconde (0 = illimité)
+        self.max_prefix = max_prefix
+        self.mac, self.address = interface_info(self.interface)
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ARP))
+        self.sock.bind((self.interface, ETH_P_ARP))
+        self.sock.setblocking(False)
+
+    def network(self) -> ipaddress.IPv4Network:
+        """Préfixe local, réduit à max_prefix autour de notre adresse"""
+        prefix = max(self.address.network.prefixlen, self.max_prefix)
+        return ipaddress.ip_interface(f"{self.address.ip}/{prefix}").network
+
+    def build_request(self, target: str) -> bytes:
+        frame = ARP_FORMAT.pack(
+            BROADCAST, self.mac, ETH_P_ARP,
+            1, ETH_P_IP, 6, 4, ARP_REQUEST,
+            self.mac, self.address.ip.packed, b'\x00' * 6, socket.inet_aton(target)
+        )
+        return frame + b'\x00' * 18  # bourrage à la taille minimale Ethernet
+
+    def receive(self, sent: Dict[str, float], results: Dict[str, Tuple[str, float]]):
+        """Vide la file de réception: réponses ARP à nos requêtes"""
+        while True:
+            try:
+                frame = self.sock.recv(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            received = time.monotonic()
+            if len(frame) < ARP_FORMAT.size:
+                continue
+            fields = ARP_FORMAT.unpack_from(frame)
+            opcode, sender_mac, sender_ip = fields[7], fields[8], fields[9]
+            if opcode != ARP_REPLY:
+                continue
+            ip = socket.inet_ntoa(sender_ip)
+            if ip in sent and ip not in results:
+                results[ip] = (format_mac(sender_mac), round((received - sent[ip]) * 1000, 3))
+
+    def sweep(self, timeout: float = 0.3, retries: int = 2) -> Dict[str, Tuple[str, float]]:
+        """{ip: (mac, rtt_ms)} des hôtes du préfixe local ayant répondu"""
+        targets = [str(ip) for ip in self.network().hosts() if ip != self.address.ip]
+        interval = 1.0 / self.rate if self.rate else 0
+        sent: Dict[str, float] = {}
+        results: Dict[str, Tuple[str, float]] = {}
+
+        for _ in range(max(1, retries)):
+            # Nouvel essai uniquement pour les hôtes muets
+            next_send = time.monotonic()
+            for ip in targets:
+                if ip in results:
+                    continue
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    # Attente utile: on traite les réponses déjà arrivées
+                    if select.select([self.sock], [], [], delay)[0]:
+                        self.receive(sent, results)
+                try:
+                    self.sock.send(self.build_request(ip))
+                    sent[ip] = time.monotonic()
+                except OSError:
+                    pass  # tampon d'émission plein: réessayé au tour suivant
+                next_send += interval
+
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or len(results) == len(targets):
+                    break
+                if select.select([self.sock], [], [], remaining)[0]:
+                    self.receive(sent, results)
+            if len(results) == len(targets):
+                break
+        return results
+
+    def close(self):
+        self.sock.close()
+
+
+def create_arp_sweeper(interface: Optional[str] = None, **options) -> Optional[ArpSweeper]:
+    """ArpSweeper prêt à l'emploi, ou None (pas Linux, pas de CAP_NET_RAW...)"""
+    try:
+        sweeper = ArpSweeper(interface, **options)
+        logger.info(f"Balayage ARP natif sur {sweeper.interface} ({sweeper.network()})")
+        return sweeper
+    except (OSError, AttributeError, ValueError) as e:
+        logger.warning(f"Balayage ARP natif indisponible ({e}), repli arp-scan / table ARP")
+        return None
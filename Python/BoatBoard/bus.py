@@ -0,0 +1,182 @@
+"""
+Bus de messages local entre processus (socket Unix)
+Le processus collecteur héberge le relais; chaque processus web s'y abonne
+via UnixSocketManager (gestionnaire python-socketio): une émission faite dans
+n'importe quel processus atteint les clients de tous les autres. Le dernier
+état publié est conservé et rejoué aux processus qui (re)connectent.
+"""
+
+import logging
+import os
+import pickle
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import socketio
+
+logger = logging.getLogger(__name__)
+
+FRAME = struct.Struct('!cI')  # type, longueur
+MESSAGE = b'M'  # message python-socketio (emit, enter_room...)
+STATE = b'S'  # instantané de l'état, conservé par le relais
+SUBSCRIBE = b'L'  # la connexion veut recevoir les messages
+
+
+def send_frame(sock: socket.socket, kind: bytes, payload: bytes = b''):
+    sock.sendall(FRAME.pack(kind, len(payload)) + payload)
+
+
+def recv_exact(sock: socket.socket, size: int) -> Optional[bytes]:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Tuple[bytes, bytes]]:
+    """(type, contenu) ou None si la connexion est fermée"""
+    header = recv_exact(sock, FRAME.size)
+    if header is None:
+        return None
+    kind, length = FRAME.unpack(header)
+    payload = recv_exact(sock, length) if length else b''
+    return None if payload is None else (kind, payload)
+
+
+class BusBroker:
+    """Relais: chaque trame reçue est renvoyée à tous les abonnés (émetteur compris)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.subscribers: Dict[socket.socket, threading.Lock] = {}
+        self.lock = threading.Lock()
+        self.last_state: Optional[bytes] = None
+        self.server: Optional[socket.socket] = None
+
+    def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # socket d'une exécution précédente
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        os.chmod(self.path, 0o600)  # trames picklées: réservé à l'utilisateur du service
+        self.server.listen(64)
+        threading.Thread(target=self._accept, name='bus-broker', daemon=True).start()
+        logger.info(f"Bus local sur {self.path}")
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(conn,), name='bus-peer', daemon=True).start()
+
+    def _serve(self, conn: socket.socket):
+        try:
+            while True:
+                frame = recv_frame(conn)
+                if frame is None:
+                    break
+                kind, payload = frame
+                if kind == SUBSCRIBE:
+                    self._subscribe(conn)
+                    continue
+                data = FRAME.pack(kind, len(payload)) + payload
+                if kind == STATE:
+                    self.last_state = data
+                self._broadcast(data)
+        except OSError:
+            pass
+        finally:
+            with self.lock:
+                self.subscribers.pop(conn, None)
+            conn.close()
+
+    def _subscribe(self, conn: socket.socket):
+        lock = threading.Lock()
+        with lock:
+            with self.lock:
+                self.subscribers[conn] = lock
+            if self.last_state is not None:
+                conn.sendall(self.last_state)  # état courant pour le nouveau processus
+
+    def _broadcast(self, data: bytes):
+        with self.lock:
+            subscribers = list(self.subscribers.items())
+        for conn, lock in subscribers:
+            try:
+                with lock:
+                    conn.sendall(data)
+            except OSError:
+                with self.lock:
+                    self.subscribers.pop(conn, None)
+
+
+class UnixSocketManager(socketio.PubSubManager):
+    """Gestionnaire de clients python-socketio relié au BusBroker"""
+
+    name = 'unix'
+
+    def __init__(self, path: str, on_state: Optional[Callable[[Dict], None]] = None,
+                 write_only: bool = False, logger=None):
+        super().__init__(channel=path, write_only=write_only, logger=logger)
+        self.path = path
+        self.on_state = on_state
+        self.sock: Optional[socket.socket] = None
+        self.send_lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        return sock
+
+    def publish(self, kind: bytes, data):
+        payload = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.send_lock:
+            for _ in range(2):  # une reconnexion si le relais a redémarré
+                try:
+                    if self.sock is None:
+                        self.sock = self._connect()
+                    send_frame(self.sock, kind, payload)
+                    return
+                except OSError as e:
+                    if self.sock is not None:
+                        self.sock.close()
+                    self.sock = None
+                    error = e
+            logger.error(f"Bus local indisponible: {error}")
+
+    def publish_state(self, snapshot: Dict):
+        """Diffuse l'état publié aux processus web (répliques)"""
+        self.publish(STATE, snapshot)
+
+    def _publish(self, data):
+        self.publish(MESSAGE, data)
+
+    def _listen(self):
+        while True:
+            try:
+                sock = self._connect()
+                send_frame(sock, SUBSCRIBE)
+                while True:
+                    frame = recv_frame(sock)
+                    if frame is None:
+                        break
+                    kind, payload = frame
+                    data = pickle.loads(payload)
+                    if kind == STATE:
+                        if self.on_state is not None:
+                            self.on_state(data)
+                    else:
+                        yield data
+                sock.close()
+            except OSError as e:
+                logger.warning(f"Connexion au bus local perdue ({e}), nouvel essai")
+            time.sleep(1)
@@ -0,0 +1,133 @@
+"""
+Suivi en continu du journal systemd
+Un seul processus `journalctl -f -o json` alimente un tampon circulaire; les
+lecteurs récupèrent uniquement les entrées postérieures à leur curseur.
+"""
+
+import json
+import logging
+import subprocess
+import threading
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def format_entry(entry: Dict) -> str:
+    """Ligne au format proche de `journalctl -o short-iso`"""
+    try:
+        timestamp = datetime.fromtimestamp(int(entry['__REALTIME_TIMESTAMP']) / 1_000_000)
+        stamp = timestamp.astimezone().isoformat(timespec='seconds')
+    except (KeyError, ValueError):
+        stamp = ''
+    identifier = entry.get('SYSLOG_IDENTIFIER') or entry.get('_COMM') or ''
+    pid = entry.get('_PID')
+    if pid:
+        identifier = f"{identifier}[{pid}]"
+    message = entry.get('MESSAGE', '')
+    if isinstance(message, list):
+        # Message binaire: journalctl le sérialise en liste d'octets
+        message = bytes(message).decode('utf-8', errors='replace')
+    return f"{stamp} {entry.get('_HOSTNAME', '')} {identifier}: {message}"
+
+
+class JournalFollower:
+    """Processus journalctl long et tampon circulaire numéroté"""
+
+    def __init__(self, max_entries: int = 5000, units: Optional[List[str]] = None,
+                 priority: Optional[str] = None, backlog: int = 50):
+        self.max_entries = max_entries
+        self.units = units or []
+        self.priority = priority
+        self.backlog = backlog
+        self.entries = deque(maxlen=max_entries)  # (seq, unit, priority, ligne)
+        self.seq = 0
+        self.cursor = None  # curseur journald de la dernière entrée reçue
+        self.lock = threading.Lock()
+        self.process = None
+        self.thread = None
+        self.stopped = threading.Event()
+
+    def command(self) -> List[str]:
+        command = ['journalctl', '-f', '-o', 'json', '--no-pager']
+        if self.cursor:
+            # Reprise après redémarrage de journalctl, sans trou ni doublon
+            command += ['--after-cursor', self.cursor]
+        else:
+            command += ['-n', str(self.backlog)]
+        for unit in self.units:
+            command += ['-u', unit]
+        if self.priority:
+            command += ['-p', self.priority]
+        return command
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='journal-follower', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.process:
+            self.process.terminate()
+
+    def _run(self):
+        backoff = 1
+        while not self.stopped.is_set():
+            try:
+                self.process = subprocess.Popen(
+                    self.command(), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                    text=True, bufsize=1
+                )
+                backoff = 1
+                for line in self.process.stdout:
+                    self._ingest(line)
+                self.process.wait()
+            except Exception as e:
+                logger.error(f"Erreur journalctl: {e}")
+            if self.stopped.is_set():
+                break
+            # journalctl s'est arrêté: relance avec temporisation croissante
+            self.stopped.wait(backoff)
+            backoff = min(backoff * 2, 60)
+
+    def _ingest(self, line: str):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            return
+        try:
+            priority = int(entry.get('PRIORITY', 6))
+        except ValueError:
+            priority = 6
+        unit = entry.get('_SYSTEMD_UNIT', '')
+        text = format_entry(entry)
+        with self.lock:
+            self.seq += 1
+            self.entries.append((self.seq, unit, priority, text))
+            self.cursor = entry.get('__CURSOR', self.cursor)
+
+    def since(self, cursor: int, unit: Optional[str] = None,
+              max_priority: Optional[int] = None, limit: Optional[int] = None) -> Tuple[int, List[str]]:
+        """Entrées postérieures au curseur (filtrées) et nouveau curseur"""
+        with self.lock:
+            last = self.seq
+            if cursor >= last:
+                return last, []
+            # Les numéros sont consécutifs: on saute directement au bon index
+            start = max(0, len(self.entries) - (last - cursor))
+            selected = [
+                text for seq, entry_unit, priority, text in islice(self.entries, start, None)
+                if (unit is None or entry_unit == unit)
+                and (max_priority is None or priority <= max_priority)
+            ]
+        if limit is not None:
+            selected = selected[-limit:]
+        return last, selected
+
+    def tail(self, count: int, unit: Optional[str] = None,
+             max_priority: Optional[int] = None) -> List[str]:
+        """Dernières lignes du tampon"""
+        return self.since(0, unit=unit, max_priority=max_priority, limit=count)[1]
@@ -0,0 +1,54 @@
+"""
+Échantillonnage non bloquant des ressources système
+CPU (global et par cœur) calculé par psutil entre deux appels successifs, et
+débits réseau calculés sur l'intervalle réellement écoulé entre deux ticks.
+"""
+
+import threading
+import time
+from typing import Dict
+
+import psutil
+
+
+class MetricsSampler:
+    """Deltas entre ticks: aucun sleep, quel que soit UPDATE_INTERVAL"""
+
+    def __init__(self, disk_path: str = '/'):
+        self.disk_path = disk_path
+        self.lock = threading.Lock()
+        # Premier appel: initialise les compteurs de référence de psutil
+        psutil.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None, percpu=True)
+        self.last_net = psutil.net_io_counters()
+        self.last_time = time.monotonic()
+
+    @staticmethod
+    def _rate(current: int, previous: int, elapsed: float) -> float:
+        """Débit en Mbps; un compteur remis à zéro donne 0"""
+        diff = current - previous
+        if diff < 0 or elapsed <= 0:
+            return 0
+        return round((diff * 8) / elapsed / 1_000_000, 2)
+
+    def sample(self) -> Dict:
+        with self.lock:
+            now = time.monotonic()
+            net_io = psutil.net_io_counters()
+            elapsed = now - self.last_time
+
+            network_speed = {
+                'sent': self._rate(net_io.bytes_sent, self.last_net.bytes_sent, elapsed),
+                'recv': self._rate(net_io.bytes_recv, self.last_net.bytes_recv, elapsed),
+            }
+            self.last_net = net_io
+            self.last_time = now
+
+            return {
+                'cpu': psutil.cpu_percent(interval=None),
+                'cpu_per_core': psutil.cpu_percent(interval=None, percpu=True),
+                'ram': psutil.virtual_memory().percent,
+                'disk': psutil.disk_usage(self.disk_path).percent,
+                'network_io': network_speed,
+                'sample_interval': round(elapsed, 3),
+            }
@@ -0,0 +1,123 @@
+"""
+Ordonnanceur de collecteurs indépendants
+Chaque collecteur tourne à sa propre cadence dans son propre thread: un
+collecteur lent (arp-scan, speedtest) ne retarde plus les métriques rapides.
+Pas de chevauchement d'exécutions, délai maximal et gigue par collecteur.
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Collector:
+    """Tâche périodique et ses statistiques d'exécution"""
+
+    def __init__(self, name: str, func: Callable[[], None], interval: float,
+                 timeout: Optional[float] = None, jitter: float = 0.0,
+                 run_at_start: bool = True):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.timeout = timeout
+        self.jitter = jitter
+        self.run_at_start = run_at_start
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'collector-{name}')
+        self.future = None
+        self.stats = {
+            'interval': interval,
+            'runs': 0,
+            'failures': 0,
+            'timeouts': 0,
+            'skipped': 0,
+            'running': False,
+            'last_duration': None,
+            'max_duration': None,
+            'last_lag': None,
+            'last_run': None,
+            'last_error': None,
+        }
+
+    def _run(self):
+        start = time.monotonic()
+        try:
+            self.func()
+        except Exception as e:
+            self.stats['failures'] += 1
+            self.stats['last_error'] = str(e)
+            logger.error(f"Erreur collecteur {self.name}: {e}")
+        finally:
+            duration = round(time.monotonic() - start, 3)
+            self.stats['runs'] += 1
+            self.stats['running'] = False
+            self.stats['last_duration'] = duration
+            self.stats['max_duration'] = max(duration, self.stats['max_duration'] or 0)
+
+    def tick(self, lag: float):
+        """Lance une exécution, sauf si la précédente n'est pas terminée"""
+        if self.future is not None and not self.future.done():
+            self.stats['skipped'] += 1
+            return
+        self.stats['running'] = True
+        self.stats['last_lag'] = round(lag, 3)
+        self.stats['last_run'] = datetime.now().strftime('%H:%M:%S')
+        self.future = self.executor.submit(self._run)
+        try:
+            self.future.result(timeout=self.timeout)
+        except FutureTimeout:
+            # L'exécution continue en arrière-plan; les ticks suivants sont sautés
+            self.stats['timeouts'] += 1
+            logger.warning(f"Collecteur {self.name}: délai de {self.timeout}s dépassé")
+
+
+class Scheduler:
+    """Un thread par collecteur, état partagé écrit par les collecteurs eux-mêmes"""
+
+    def __init__(self):
+        self.collectors: Dict[str, Collector] = {}
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def add(self, name: str, func: Callable[[], None], interval: float, **options) -> Collector:
+        collector = Collector(name, func, interval, **options)
+        self.collectors[name] = collector
+        return collector
+
+    def _loop(self, collector: Collector):
+        # Échéances de base fixes; la gigue décale chaque exécution sans
+        # s'accumuler (période moyenne = interval)
+        base = time.monotonic()
+        if not collector.run_at_start:
+            base += collector.interval
+        next_run = base + random.uniform(0, collector.jitter)
+        while not self.stop_event.is_set():
+            delay = next_run - time.monotonic()
+            if delay > 0 and self.stop_event.wait(delay):
+                break
+            collector.tick(time.monotonic() - next_run)
+            base += collector.interval
+            now = time.monotonic()
+            if base < now:
+                # Exécution plus longue que l'intervalle: on ne rattrape pas
+                base = now
+            next_run = base + random.uniform(0, collector.jitter)
+
+    def start(self):
+        for collector in self.collectors.values():
+            thread = threading.Thread(target=self._loop, args=(collector,),
+                                      name=f'scheduler-{collector.name}', daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Durée d'exécution et retard de chaque collecteur"""
+        return {name: dict(c.stats) for name, c in self.collectors.items()}
@@ -0,0 +1,159 @@
+"""
+État versionné du tableau de bord
+Chaque commit produit un delta (champs modifiés, appareils ajoutés/modifiés/
+supprimés, nouvelles lignes de log) à partir de la version précédente; les
+clients appliquent les deltas et demandent un instantané en cas de trou.
+"""
+
+import copy
+import ipaddress
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+
+def _ip_key(ip: str):
+    try:
+        return (0, int(ipaddress.ip_address(ip)), '')
+    except ValueError:
+        return (1, 0, ip)
+
+
+def merge_by_mac(devices: Iterable[Dict]) -> Dict[str, Dict]:
+    """Un appareil par MAC (hôte multi-adresses, proxy ARP, VM derrière un pont)
+
+    L'appareil garde la plus petite IP en 'ip' (champs de cette ligne) et, s'il
+    en a plusieurs, la liste triée dans 'ips': le résultat ne dépend pas de
+    l'ordre des lignes, un réseau inchangé ne produit donc aucun delta.
+    """
+    merged: Dict[str, Dict] = {}
+    for device in sorted(devices, key=lambda d: _ip_key(d['ip'])):
+        ips = device.get('ips') or [device['ip']]
+        entry = merged.get(device['mac'])
+        if entry is None:
+            entry = merged[device['mac']] = dict(device)
+            entry.pop('ips', None)
+            entry['_ips'] = set(ips)
+        else:
+            entry['_ips'].update(ips)
+    for entry in merged.values():
+        ips = sorted(entry.pop('_ips'), key=_ip_key)
+        if len(ips) > 1:
+            entry['ips'] = ips
+    return merged
+
+
+class StateStore:
+    """Stockage partagé entre collecteurs et diffusion Socket.IO"""
+
+    def __init__(self, initial: Dict, max_logs: int = 50):
+        self.lock = threading.RLock()
+        self.epoch = format(int(time.time() * 1000), 'x')  # change à chaque redémarrage
+        self.version = 0
+        self.max_logs = max_logs
+        self.fields = {k: v for k, v in initial.items() if k not in ('devices', 'logs')}
+        self.devices: Dict[str, Dict] = {}  # mac -> appareil, dans l'ordre d'arrivée
+        self.logs = deque(maxlen=max_logs)
+        self._changed_fields: Dict = {}
+        self._upserts: Dict[str, Dict] = {}
+        self._removed: set = set()
+        self._new_logs: List[str] = []
+        self._published = self._build_snapshot()
+
+    def get(self, key: str, default=None):
+        with self.lock:
+            if key == 'devices':
+                return list(self.devices.values())
+            if key == 'logs':
+                return list(self.logs)
+            return self.fields.get(key, default)
+
+    def update(self, values: Dict):
+        """Met à jour des champs simples; seuls les changements sont retenus"""
+        with self.lock:
+            for key, value in values.items():
+                if self.fields.get(key) != value:
+                    self.fields[key] = copy.deepcopy(value)
+                    self._changed_fields[key] = self.fields[key]
+
+    def set_devices(self, devices: Iterable[Dict]):
+        """Remplace la liste des appareils (clé: MAC) et calcule le diff"""
+        merged = merge_by_mac(devices)
+        with self.lock:
+            seen = set()
+            for mac, device in merged.items():
+                seen.add(mac)
+                if self.devices.get(mac) != device:
+                    self.devices[mac] = device
+                    self._upserts[mac] = device
+                    self._removed.discard(mac)
+            for mac in list(self.devices):
+                if mac not in seen:
+                    del self.devices[mac]
+                    self._upserts.pop(mac, None)
+                    self._removed.add(mac)
+
+    def upsert_device(self, device: Dict):
+        """Ajoute ou complète un seul appareil (clé: MAC), ex. découverte passive"""
+        with self.lock:
+            mac = device['mac']
+            merged = {**self.devices.get(mac, {}), **device}
+            if self.devices.get(mac) != merged:
+                self.devices[mac] = merged
+                self._upserts[mac] = merged
+                self._removed.discard(mac)
+
+    def append_logs(self, lines: Iterable[str]):
+        """Ajoute de nouvelles lignes de log"""
+        with self.lock:
+            for line in lines:
+                self.logs.append(line)
+                self._new_logs.append(line)
+            del self._new_logs[:-self.max_logs]
+
+    def commit(self) -> Optional[Dict]:
+        """Publie une nouvelle version; retourne le delta ou None si rien n'a changé"""
+        with self.lock:
+            if not (self._changed_fields or self._upserts or self._removed or self._new_logs):
+                return None
+            self.version += 1
+            delta = {'version': self.version, 'base': self.version - 1}
+            if self._changed_fields:
+                delta['fields'] = self._changed_fields
+            if self._upserts or self._removed:
+                delta['devices'] = {
+                    'upsert': list(self._upserts.values()),
+                    'remove': sorted(self._removed),
+                }
+            if self._new_logs:
+                delta['logs'] = self._new_logs
+            self._changed_fields, self._upserts, self._removed, self._new_logs = {}, {}, set(), []
+            self._published = self._build_snapshot()
+            return copy.deepcopy(delta)
+
+    def _build_snapshot(self) -> Dict:
+        data = copy.deepcopy(self.fields)
+        data['devices'] = [dict(d) for d in self.devices.values()]
+        data['logs'] = list(self.logs)
+        data['version'] = self.version
+        data['epoch'] = self.epoch
+        data['max_logs'] = self.max_logs
+        return data
+
+    def load(self, snapshot: Dict):
+        """Remplace l'état par un instantané publié par un autre processus (réplique)"""
+        with self.lock:
+            self.fields = {k: v for k, v in snapshot.items()
+                           if k not in ('devices', 'logs', 'version', 'epoch', 'max_logs')}
+            self.devices = {d['mac']: d for d in snapshot['devices']}
+            self.logs = deque(snapshot['logs'], maxlen=self.max_logs)
+            self.version = snapshot['version']
+            self.epoch = snapshot['epoch']
+            self._changed_fields, self._upserts, self._removed, self._new_logs = {}, {}, set(), []
+            self._published = snapshot
+
+    def snapshot(self) -> Dict:
+        """État complet de la dernière version publiée (lecture seule)"""
+        with self.lock:
+            return self._published
@@ -0,0 +1,39 @@
+"""
+Tests du StateStore: une MAC vue à plusieurs IP (python -m pytest test_state.py)
+"""
+
+from state import StateStore, merge_by_mac
+
+
+def device(ip, mac='aa:bb:cc:dd:ee:01', hostname=''):
+    return {'ip': ip, 'mac': mac, 'vendor': '', 'type': 'computer', 'hostname': hostname}
+
+
+def test_merge_keeps_every_ip_of_a_mac():
+    merged = merge_by_mac([device('192.168.1.20'), device('192.168.1.3'), device('192.168.1.9')])
+    assert list(merged) == ['aa:bb:cc:dd:ee:01']
+    assert merged['aa:bb:cc:dd:ee:01']['ip'] == '192.168.1.3'
+    assert merged['aa:bb:cc:dd:ee:01']['ips'] == ['192.168.1.3', '192.168.1.9', '192.168.1.20']
+
+
+def test_single_ip_has_no_ips_list():
+    merged = merge_by_mac([device('192.168.1.3')])
+    assert 'ips' not in merged['aa:bb:cc:dd:ee:01']
+
+
+def test_unchanged_multi_ip_network_produces_no_delta():
+    store = StateStore({'devices': [], 'logs': []})
+    store.set_devices([device('10.0.0.2'), device('10.0.0.1'), device('10.0.0.5', mac='aa:bb:cc:dd:ee:02')])
+    assert store.commit()
+    # Même réseau, lignes dans un autre ordre: aucun appareil rediffusé
+    store.set_devices([device('10.0.0.5', mac='aa:bb:cc:dd:ee:02'), device('10.0.0.1'), device('10.0.0.2')])
+    assert not store.commit()
+    assert len(store.get('devices')) == 2
+
+
+def test_devices_from_the_store_merge_again_unchanged():
+    store = StateStore({'devices': [], 'logs': []})
+    store.set_devices([device('10.0.0.2'), device('10.0.0.1')])
+    store.commit()
+    store.set_devices(store.get('devices'))
+    assert not store.commit()
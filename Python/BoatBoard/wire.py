@@ -0,0 +1,185 @@
+"""
+Formats compacts du flux temps réel
+'json' (défaut historique), 'packed' (appareils en colonnes: IP et MAC en
+entiers, chaînes internées) et 'msgpack' (même structure en binaire, si le
+paquet msgpack est installé). Chaque client choisit son format à la connexion.
+Les messages sont sérialisés une seule fois (RawJSON) et les instantanés une
+fois par version, avec leurs variantes compressées.
+"""
+
+import gzip
+import ipaddress
+import json
+import re
+import threading
+from typing import Dict, List, Optional, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+WIRE_FORMATS = ('json', 'packed') + (('msgpack',) if msgpack is not None else ())
+DEFAULT_FORMAT = 'json'
+
+_CANONICAL_MAC = re.compile(r'^[0-9a-f]{2}(:[0-9a-f]{2}){5}$')
+
+
+def negotiate(requested: Optional[str]) -> str:
+    """Format demandé s'il est disponible; msgpack absent -> packed"""
+    if requested in WIRE_FORMATS:
+        return requested
+    if requested == 'msgpack':
+        return 'packed'
+    return DEFAULT_FORMAT
+
+
+def ip_to_int(ip: str) -> int:
+    address = ipaddress.IPv4Address(ip)
+    if str(address) != ip:
+        raise ValueError(ip)  # forme non canonique: la chaîne est conservée
+    return int(address)
+
+
+def mac_to_int(mac: str) -> int:
+    if not _CANONICAL_MAC.match(mac):
+        raise ValueError(mac)
+    return int(mac.replace(':', ''), 16)
+
+
+_NUMERIC = {'ip': ip_to_int, 'mac': mac_to_int}
+
+
+def pack_devices(devices: List[Dict]) -> Dict:
+    """Liste d'appareils -> colonnes; chaque clé n'apparaît qu'une fois"""
+    strings: Dict[str, int] = {}
+    columns: Dict[str, List] = {}
+    encoding: Dict[str, str] = {}
+    for key in sorted({key for device in devices for key in device}):
+        values = [device.get(key) for device in devices]
+        if key in _NUMERIC:
+            try:
+                columns[key] = [_NUMERIC[key](v) for v in values]
+                encoding[key] = key
+                continue
+            except (ValueError, TypeError):
+                pass
+        if all(v is None or isinstance(v, str) for v in values):
+            # Chaînes internées: vendor/type/hostname se répètent beaucoup
+            columns[key] = [None if v is None else strings.setdefault(v, len(strings)) for v in values]
+            encoding[key] = 'str'
+        else:
+            columns[key] = values
+            encoding[key] = 'raw'
+    return {'count': len(devices), 'strings': list(strings), 'columns': columns, 'encoding': encoding}
+
+
+def pack_macs(macs: List[str]) -> Dict:
+    return pack_devices([{'mac': mac} for mac in macs])
+
+
+def pack_payload(payload: Dict) -> Dict:
+    """Instantané ou delta avec les appareils en colonnes"""
+    packed = dict(payload, wire='packed')
+    devices = payload.get('devices')
+    if isinstance(devices, list):
+        packed['devices'] = pack_devices(devices)  # instantané
+    elif isinstance(devices, dict):
+        packed['devices'] = {
+            'upsert': pack_devices(devices['upsert']),
+            'remove': pack_macs(devices['remove'])
+        }
+    return packed
+
+
+def encode(payload: Dict, wire_format: str):
+    """Message prêt à émettre dans le format du client"""
+    if wire_format == 'json':
+        return payload
+    packed = pack_payload(payload)
+    if wire_format == 'msgpack':
+        return msgpack.packb(packed, use_bin_type=True)
+    return packed
+
+
+class RawJSON(str):
+    """JSON déjà sérialisé, inséré tel quel par SocketJSON"""
+
+
+class SocketJSON:
+    """Module json de python-socketio: les RawJSON ne sont pas resérialisés"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        if isinstance(obj, RawJSON):
+            return str(obj)
+        if isinstance(obj, (list, tuple)) and any(isinstance(item, RawJSON) for item in obj):
+            # Paquet Socket.IO: [événement, message]
+            return '[' + ','.join(item if isinstance(item, RawJSON) else json.dumps(item, **kwargs)
+                                  for item in obj) + ']'
+        return json.dumps(obj, **kwargs)
+
+    loads = staticmethod(json.loads)
+
+
+def serialize(payload: Dict, wire_format: str) -> Union[RawJSON, bytes]:
+    """Message prêt à émettre, sérialisé une fois pour tous les clients du format"""
+    message = encode(payload, wire_format)
+    if isinstance(message, bytes):
+        return message
+    return RawJSON(json.dumps(message, separators=(',', ':')))
+
+
+class SerializedSnapshot:
+    """Un instantané sérialisé et ses variantes compressées (calculées à la demande)"""
+
+    def __init__(self, version: int, message: Union[RawJSON, bytes], etag: str):
+        self.version = version
+        self.message = message
+        self.body = message if isinstance(message, bytes) else message.encode()
+        self.etag = etag
+        self._compressed: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def compressed(self, encoding: str) -> Optional[bytes]:
+        """Corps compressé ('br' si brotli est installé, 'gzip'), None sinon"""
+        with self._lock:
+            if encoding not in self._compressed:
+                if encoding == 'gzip':
+                    self._compressed[encoding] = gzip.compress(self.body, compresslevel=6)
+                elif encoding == 'br' and brotli is not None:
+                    self._compressed[encoding] = brotli.compress(self.body, quality=5)
+                else:
+                    return None
+            return self._compressed[encoding]
+
+
+class SnapshotCache:
+    """Instantané de la dernière version, sérialisé une fois par format"""
+
+    def __init__(self, store):
+        self.store = store
+        self.lock = threading.Lock()
+        self.version = None
+        self.entries: Dict[str, SerializedSnapshot] = {}
+
+    def get(self, wire_format: str = 'json') -> SerializedSnapshot:
+        snapshot = self.store.snapshot()
+        # L'époque distingue deux états de même numéro après un redémarrage
+        version = (snapshot['epoch'], snapshot['version'])
+        with self.lock:
+            if version != self.version:
+                self.version, self.entries = version, {}
+            entry = self.entries.get(wire_format)
+        if entry is None:
+            entry = SerializedSnapshot(snapshot['version'], serialize(snapshot, wire_format),
+                                       f"{version[0]}-{version[1]}-{wire_format}")
+            with self.lock:
+                if version == self.version:
+                    entry = self.entries.setdefault(wire_format, entry)
+        return entry
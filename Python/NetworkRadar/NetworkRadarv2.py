@@ -12,13 +12,36 @@ import ipaddress
 import threading
 import time
 import re
-from collections import deque
+import os
+import sys
 from datetime import datetime
 
+# Modules communs (Python/netcommon), à côté du dossier de l'outil
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from icmp_probe import RttStats, create_probe_engine
+from liveness import LivenessMonitor
+from netcommon.history import HistoryStore
+from netcommon.passive import create_passive_listener
+from scan_planner import ScanPlan, plan_scan
+
 # Configuration
 WIDTH, HEIGHT = 1200, 800
 FPS = 60
+IDLE_FPS = 20  # sans interaction depuis IDLE_AFTER secondes
+BACKGROUND_FPS = 5  # fenêtre sans le focus
+HIDDEN_FPS = 1  # fenêtre réduite
+IDLE_AFTER = 60  # secondes
+SWEEP_SPEED = 120  # degrés par seconde, indépendant du nombre d'images
+DIRTY_RECTS = os.getenv('RADAR_DIRTY_RECTS', '1') != '0'  # 0: image complète à chaque frame
 SCAN_INTERVAL = 5  # secondes entre chaque ping
+FAST_INTERVAL = 1  # secondes entre deux pings d'un appareil instable
+MAX_INTERVAL = 60  # secondes max entre deux pings d'un appareil hors ligne
+PROBE_RATE = 2000  # paquets ICMP par seconde lors d'un balayage
+PROBE_TIMEOUT = 1.0  # secondes d'attente des réponses
+RTT_WINDOW = 50  # sondes prises en compte pour min/avg/max, gigue et pertes
+PASSIVE_DISCOVERY = os.getenv('RADAR_PASSIVE', '1') != '0'  # écoute ARP/mDNS/DHCP entre deux scans
+HISTORY_DB = os.getenv('RADAR_HISTORY_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'radar_history.db'))
 
 # Couleurs - Thème bleu glacial
 ICE_BLUE = (2, 2, 40)  # Fond bleu glacial foncé
@@ -39,11 +62,13 @@ class NetworkDevice:
         self.is_online = True
         self.last_seen = datetime.now()
         self.response_time = 0
+        self.latency = RttStats(RTT_WINDOW)
         self.angle = 0  # Position angulaire sur le radar
         self.distance = 0  # Distance du centre (simulée)
         
     def update_status(self, is_online, response_time=0):
         self.is_online = is_online
+        self.latency.add(response_time if is_online else None)
         if is_online:
             self.last_seen = datetime.now()
             self.response_time = response_time
@@ -52,10 +77,25 @@ class NetworkScanner:
     """Gestion du scan réseau et des pings"""
     def __init__(self):
         self.devices = {}
-        self.network = self.get_local_network()
+        self.plan = self.build_plan(self.get_local_network())
+        self.network = self.plan.describe()
         self.scanning = False
         self.scan_thread = None
         self.ping_thread = None
+        self.probe = create_probe_engine(rate=PROBE_RATE)
+        print(f"✓ Moteur de sonde: {self.probe.name}")
+        self.monitor = LivenessMonitor(
+            self.probe,
+            interval=SCAN_INTERVAL,
+            fast_interval=FAST_INTERVAL,
+            max_interval=MAX_INTERVAL,
+            timeout=PROBE_TIMEOUT,
+            on_result=self.on_liveness
+        )
+        
+        # Historique up/down/RTT par appareil, conservé entre deux lancements
+        self.history = HistoryStore(HISTORY_DB)
+        self.passive = None
         
     def get_local_network(self):
         """Détecte le réseau local en analysant ipconfig sur Windows"""
@@ -133,98 +173,124 @@ class NetworkScanner:
             base = '.'.join(ip.split('.')[:3])
             return f"{base}.0/24"
     
+    def build_plan(self, default_network):
+        """Interfaces locales + RADAR_CIDRS - RADAR_EXCLUDE (repli: réseau détecté)"""
+        try:
+            plan = plan_scan(default=default_network)
+        except ValueError as e:
+            print(f"⚠ {e}, repli sur {default_network}")
+            plan = ScanPlan([ipaddress.ip_network(default_network, strict=False)])
+        for network in plan.networks:
+            print(f"✓ Réseau planifié: {network}")
+        return plan
+    
     def ping_device(self, ip):
         """Ping un appareil et retourne (success, response_time)"""
-        param = "-n" if platform.system() == "Windows" else "-c"
-        timeout_param = "-w" if platform.system() == "Windows" else "-W"
-        
-        try:
-            start = time.time()
-            result = subprocess.run(
-                ['ping', param, '1', timeout_param, '1000', str(ip)],
-                capture_output=True,
-                text=True,
-                timeout=2
-            )
-            response_time = (time.time() - start) * 1000  # en ms
-            return result.returncode == 0, response_time
-        except:
-            return False, 0
+        return self.probe.ping(ip, timeout=PROBE_TIMEOUT)
     
     def scan_network(self):
-        """Scanne le réseau pour trouver les appareils"""
-        print(f"\n🔍 Scan du réseau {self.network}...")
+        """Scanne les réseaux du plan par lots pour trouver les appareils"""
+        total = len(self.plan)
+        estimate = self.plan.estimate(PROBE_RATE, PROBE_TIMEOUT)
+        print(f"\n🔍 Scan de {self.plan.describe()} ({total} IPs, ~{estimate:.0f}s)...")
         print("=" * 50)
-        network = ipaddress.ip_network(self.network, strict=False)
-        
-        angle_step = 360 / min(254, network.num_addresses)
-        current_angle = 0
-        
-        scanned = 0
-        total = min(254, network.num_addresses - 2)
         
-        for ip in network.hosts():
+        # Angle sur le radar selon la position de l'adresse dans le plan
+        angle_step = 360 / max(1, total)
+        index = 0
+        start = time.monotonic()
+        for batch in self.plan.batches():
             if not self.scanning:
                 break
-                
-            ip_str = str(ip)
-            is_online, response_time = self.ping_device(ip_str)
+            angles = {ip: ((index + i) * angle_step) % 360 for i, ip in enumerate(batch)}
+            index += len(batch)
             
-            scanned += 1
-            if scanned % 10 == 0:  # Affiche progression tous les 10 IPs
-                print(f"Progression: {scanned}/{total} IPs scannées...")
+            # Un balayage par lot; les appareils apparaissent lot après lot
+            replies = self.probe.sweep(
+                batch,
+                timeout=PROBE_TIMEOUT,
+                cancel=lambda: not self.scanning,
+                on_reply=lambda ip, rtt: print(f"✓ Appareil trouvé: {ip} ({rtt:.0f}ms)")
+            )
             
-            if is_online:
+            for ip_str, response_time in replies.items():
                 if ip_str not in self.devices:
                     # Nouvel appareil détecté
                     device = NetworkDevice(ip_str)
-                    device.angle = current_angle
+                    device.angle = angles[ip_str]
                     device.distance = 50 + (hash(ip_str) % 200)  # Distance simulée
+                    device.update_status(True, response_time)
                     self.devices[ip_str] = device
-                    print(f"✓ Appareil trouvé: {ip_str} ({response_time:.0f}ms)")
                 else:
                     self.devices[ip_str].update_status(True, response_time)
-            
-            current_angle += angle_step
+                self.monitor.track(ip_str)
+                self.record_status(self.devices[ip_str])
+        elapsed = time.monotonic() - start
         
         print("=" * 50)
-        print(f"✅ Scan terminé. {len(self.devices)} appareil(s) trouvé(s).\n")
+        print(f"✅ Scan terminé en {elapsed:.2f}s ({index} IPs). {len(self.devices)} appareil(s) trouvé(s).\n")
+    
+    def record_status(self, device):
+        """Enregistre l'état de l'appareil dans l'historique"""
+        self.history.record(f"device.{device.ip}.up", 1 if device.is_online else 0)
+        if device.is_online:
+            self.history.record(f"device.{device.ip}.rtt", device.response_time)
+    
+    def on_liveness(self, ip, is_online, response_time):
+        """Résultat d'un tour de surveillance pour un appareil"""
+        device = self.devices.get(ip)
+        if device is not None:
+            device.update_status(is_online, response_time)
+            self.record_status(device)
+    
+    def on_passive_device(self, info):
+        """Appareil vu passivement (ARP/mDNS/DHCP): ajouté sans attendre un scan"""
+        ip = info['ip']
+        device = self.devices.get(ip)
+        if device is None:
+            device = NetworkDevice(ip, info['hostname'] or "Unknown")
+            device.angle = hash(ip) % 360
+            device.distance = 50 + (hash(ip) % 200)  # Distance simulée
+            self.devices[ip] = device
+            print(f"✓ Appareil vu passivement: {ip} ({info['source']})")
+            self.monitor.track(ip)
+            self.record_status(device)
+        elif info['hostname']:
+            device.hostname = info['hostname']
     
     def continuous_ping(self):
-        """Ping continu des appareils détectés"""
-        while self.scanning:
-            for ip, device in list(self.devices.items()):
-                if not self.scanning:
-                    break
-                is_online, response_time = self.ping_device(ip)
-                device.update_status(is_online, response_time)
-            
-            time.sleep(SCAN_INTERVAL)
+        """Ping continu des appareils détectés, en un balayage groupé par tour"""
+        self.monitor.run(lambda: not self.scanning)
     
     def start_scanning(self):
         """Démarre le scan et le monitoring"""
         if not self.scanning:
             self.scanning = True
+            if PASSIVE_DISCOVERY:
+                self.passive = create_passive_listener(on_change=self.on_passive_device)
             self.scan_thread = threading.Thread(target=self.scan_network, daemon=True)
             self.scan_thread.start()
             
             # Attend que le scan initial soit terminé
             self.scan_thread.join()
             
-            # Lance le ping continu
-            if len(self.devices) > 0:
+            # Lance le ping continu (l'écoute passive peut ajouter des appareils plus tard)
+            if len(self.devices) > 0 or self.passive is not None:
                 self.ping_thread = threading.Thread(target=self.continuous_ping, daemon=True)
                 self.ping_thread.start()
     
     def stop_scanning(self):
         """Arrête le scan"""
         self.scanning = False
+        if self.passive is not None:
+            self.passive.stop()
+        self.history.close()
 
 class RadarDisplay:
     """Affichage graphique du radar"""
     def __init__(self, width, height):
         pygame.init()
-        self.screen = pygame.display.set_mode((width, height))
+        self.screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
         pygame.display.set_caption("Network Radar Scanner - Ice Blue Edition")
         self.clock = pygame.time.Clock()
         self.font = pygame.font.Font(None, 20)
@@ -232,33 +298,70 @@ class RadarDisplay:
         self.font_large = pygame.font.Font(None, 32)
         self.font_title = pygame.font.Font(None, 48)
         
+        self.sweep_angle = 0
+        self.sweep_speed = SWEEP_SPEED
+        
+        # Traînée: 30 lignes espacées de 2° derrière le balayage
+        self.trail_steps = 30
+        self.trail_spacing = 2
+        
+        # Textes déjà rendus, par (police, texte, couleur)
+        self.text_cache = {}
+        
+        # Zones dessinées à l'image précédente, à effacer à la suivante
+        self.previous_rects = []
+        self.panel_key = None
+        self.last_input = time.monotonic()
+        self.resize(width, height)
+    
+    def resize(self, width, height):
+        """Recalcule la géométrie et invalide les calques pré-rendus"""
+        self.width = width
+        self.height = height
         self.center_x = width // 2
         self.center_y = height // 2
         self.radar_radius = min(width, height) // 3
-        
-        self.sweep_angle = 0
-        self.sweep_speed = 2
-        
-        # Historique des positions pour l'effet de traînée
-        self.sweep_trail = deque(maxlen=30)
+        self.background = None
+        self.info_overlay = None
+        self.legend_overlay = None
+        self.full_redraw = True
     
-    def draw_radar_grid(self):
+    def render_text(self, font, text, color):
+        """font.render avec cache (les textes des appareils changent peu)"""
+        key = (id(font), text, color)
+        surface = self.text_cache.get(key)
+        if surface is None:
+            if len(self.text_cache) > 1024:
+                self.text_cache.clear()
+            surface = self.text_cache[key] = font.render(text, True, color)
+        return surface
+    
+    def build_background(self):
+        """Calque statique: fond, grille, labels et instructions"""
+        background = pygame.Surface((self.width, self.height)).convert()
+        background.fill(ICE_BLUE)
+        self.draw_radar_grid(background)
+        instructions = self.render_text(self.font, "R: Nouveau scan | ESC: Quitter", PALE_ICE)
+        background.blit(instructions, (self.width // 2 - 140, self.height - 35))
+        return background
+    
+    def draw_radar_grid(self, surface):
         """Dessine la grille du radar avec style glacial"""
         # Cercles concentriques
         for i in range(1, 5):
             radius = self.radar_radius * i // 4
             # Effet de brillance sur les cercles
-            pygame.draw.circle(self.screen, LIGHT_ICE, 
+            pygame.draw.circle(surface, LIGHT_ICE, 
                              (self.center_x, self.center_y), radius, 2)
-            pygame.draw.circle(self.screen, PALE_ICE, 
+            pygame.draw.circle(surface, PALE_ICE, 
                              (self.center_x, self.center_y), radius, 1)
         
         # Cercle extérieur plus épais
-        pygame.draw.circle(self.screen, CYAN_ICE, 
+        pygame.draw.circle(surface, CYAN_ICE, 
                          (self.center_x, self.center_y), self.radar_radius, 3)
         
         # Cercle extérieur plus épais
-        pygame.draw.circle(self.screen, CYAN_ICE, 
+        pygame.draw.circle(surface, CYAN_ICE, 
                          (self.center_x, self.center_y), self.radar_radius, 5)
         
         # Lignes radiales (tous les 15 degrés)
@@ -269,11 +372,11 @@ class RadarDisplay:
             
             # Lignes principales plus épaisses tous les 45°
             if angle % 45 == 0:
-                pygame.draw.line(self.screen, LIGHT_ICE,
+                pygame.draw.line(surface, LIGHT_ICE,
                                (self.center_x, self.center_y),
                                (end_x, end_y), 2)
             else:
-                pygame.draw.line(self.screen, LIGHT_ICE,
+                pygame.draw.line(surface, LIGHT_ICE,
                                (self.center_x, self.center_y),
                                (end_x, end_y), 1)
         
@@ -284,22 +387,35 @@ class RadarDisplay:
             label_dist = self.radar_radius + 30
             x = self.center_x + math.cos(rad) * label_dist
             y = self.center_y + math.sin(rad) * label_dist
-            text = self.font.render(f"{angle}°", True, CYAN_ICE)
+            text = self.render_text(self.font, f"{angle}°", CYAN_ICE)
             rect = text.get_rect(center=(x, y))
-            self.screen.blit(text, rect)
+            surface.blit(text, rect)
         
         # Point central brillant
-        pygame.draw.circle(self.screen, GLOW_CYAN, (self.center_x, self.center_y), 8)
-        pygame.draw.circle(self.screen, WHITE, (self.center_x, self.center_y), 4)
+        pygame.draw.circle(surface, GLOW_CYAN, (self.center_x, self.center_y), 8)
+        pygame.draw.circle(surface, WHITE, (self.center_x, self.center_y), 4)
 
-    def draw_sweep(self):
+    def trail_angles(self):
+        """Angles de la traînée, du plus ancien au balayage courant"""
+        return [self.sweep_angle - (self.trail_steps - 1 - i) * self.trail_spacing
+                for i in range(self.trail_steps)]
+    
+    def sweep_rect(self):
+        """Rectangle englobant la traînée et la ligne de balayage"""
+        points = [(self.center_x, self.center_y)]
+        for angle in self.trail_angles():
+            rad = math.radians(angle)
+            points.append((self.center_x + math.cos(rad) * self.radar_radius,
+                           self.center_y + math.sin(rad) * self.radar_radius))
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        return pygame.Rect(min(xs) - 4, min(ys) - 4, max(xs) - min(xs) + 9, max(ys) - min(ys) + 9)
+    
+    def draw_sweep(self, dt):
         """Dessine le balayage du radar avec effet de traînée amélioré"""
-        # Ajoute la position actuelle à la traînée
-        self.sweep_trail.append(self.sweep_angle)
-        
         # Dessine la traînée avec transparence décroissante et dégradé
-        for i, angle in enumerate(self.sweep_trail):
-            alpha = int(255 * (i / len(self.sweep_trail)))
+        for i, angle in enumerate(self.trail_angles()):
+            alpha = int(255 * (i / self.trail_steps))
             rad = math.radians(angle)
             end_x = self.center_x + math.cos(rad) * self.radar_radius
             end_y = self.center_y + math.sin(rad) * self.radar_radius
@@ -309,7 +425,7 @@ class RadarDisplay:
             color = (green_component, alpha, alpha)
             
             # Épaisseur variable
-            thickness = max(1, int(3 * (i / len(self.sweep_trail))))
+            thickness = max(1, int(3 * (i / self.trail_steps)))
             pygame.draw.line(self.screen, color,
                            (self.center_x, self.center_y),
                            (end_x, end_y), thickness)
@@ -327,18 +443,25 @@ class RadarDisplay:
                         (self.center_x, self.center_y),
                         (end_x, end_y), 2)
         
-        # Met à jour l'angle
-        self.sweep_angle = (self.sweep_angle + self.sweep_speed) % 360
+        # Met à jour l'angle selon le temps écoulé (vitesse constante quel que soit le FPS)
+        self.sweep_angle = (self.sweep_angle + self.sweep_speed * dt) % 360
 
-    def draw_device(self, device):
-        """Dessine un appareil sur le radar avec effet de clignotement au passage du balayage"""
-        # Calcul de la position
+    def device_position(self, device):
+        """Position de l'appareil à l'écran"""
         rad = math.radians(device.angle)
         scale = device.distance / 300  # Normalisation
         distance = self.radar_radius * scale
-        
-        x = int(self.center_x + math.cos(rad) * distance)
-        y = int(self.center_y + math.sin(rad) * distance)
+        return (int(self.center_x + math.cos(rad) * distance),
+                int(self.center_y + math.sin(rad) * distance))
+    
+    def device_rect(self, device):
+        """Zone maximale touchée par l'appareil (ondes de passage comprises)"""
+        x, y = self.device_position(device)
+        return pygame.Rect(x - 64, y - 64, 129, 129)
+
+    def draw_device(self, device):
+        """Dessine un appareil sur le radar avec effet de clignotement au passage du balayage"""
+        x, y = self.device_position(device)
         
         # Couleur selon le statut
         color = GREEN if device.is_online else RED
@@ -398,105 +521,168 @@ class RadarDisplay:
                 pulse_size = 13 + int(5 * math.sin(time.time() * 2))
                 pygame.draw.circle(self.screen, color, (x, y), pulse_size, 1)
     
-    def draw_info_panel(self, scanner):
-        """Dessine le panneau d'informations avec style amélioré"""
-        panel_x = 30
-        panel_y = 30
-        
-        # Fond semi-transparent pour le panneau
+    def build_info_overlay(self):
+        """Calque du panneau d'informations: fond, bordure, titres et libellés"""
         panel_width = 350
         panel_height = 350
-        panel_surface = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
-        panel_surface.fill((10, 25, 50, 180))
-        self.screen.blit(panel_surface, (panel_x - 15, panel_y - 15))
+        overlay = pygame.Surface((panel_width, panel_height), pygame.SRCALPHA)
+        overlay.fill((10, 25, 50, 180))
         
         # Bordure du panneau
-        pygame.draw.rect(self.screen, CYAN_ICE, 
-                        (panel_x - 15, panel_y - 15, panel_width, panel_height), 2)
-        
-        # Titre stylisé
-        title = self.font_large.render("NETWORK RADAR", True, GLOW_CYAN)
-        self.screen.blit(title, (panel_x, panel_y))
+        pygame.draw.rect(overlay, CYAN_ICE, (0, 0, panel_width, panel_height), 2)
         
-        # Sous-titre
-        subtitle = self.font_small.render("Ice Blue Edition", True, PALE_ICE)
-        self.screen.blit(subtitle, (panel_x, panel_y + 35))
+        # Titre stylisé et sous-titre (origine décalée de 15px: marge intérieure)
+        overlay.blit(self.render_text(self.font_large, "NETWORK RADAR", GLOW_CYAN), (15, 15))
+        overlay.blit(self.render_text(self.font_small, "Ice Blue Edition", PALE_ICE), (15, 50))
         
-        # Informations générales
-        y_offset = panel_y + 70
-        info_lines = [
-            ("Réseau:", scanner.network),
-            ("Appareils:", str(len(scanner.devices))),
-            ("En ligne:", str(sum(1 for d in scanner.devices.values() if d.is_online))),
-            ("Hors ligne:", str(sum(1 for d in scanner.devices.values() if not d.is_online))),
-        ]
-        
-        for label, value in info_lines:
-            text_label = self.font.render(label, True, LIGHT_ICE)
-            text_value = self.font.render(value, True, WHITE)
-            self.screen.blit(text_label, (panel_x, y_offset))
-            self.screen.blit(text_value, (panel_x + 120, y_offset))
+        y_offset = 85
+        for label in ("Réseau:", "Appareils:", "En ligne:", "Hors ligne:"):
+            overlay.blit(self.render_text(self.font, label, LIGHT_ICE), (15, y_offset))
             y_offset += 28
         
         # Séparateur
-        pygame.draw.line(self.screen, CYAN_ICE, 
-                        (panel_x, y_offset + 5), 
-                        (panel_x + 320, y_offset + 5), 2)
+        pygame.draw.line(overlay, CYAN_ICE, (15, y_offset + 5), (335, y_offset + 5), 2)
         
-        # Liste des appareils
         y_offset += 20
-        list_title = self.font.render("APPAREILS DÉTECTÉS:", True, CYAN_ICE)
-        self.screen.blit(list_title, (panel_x, y_offset))
-        y_offset += 30
+        overlay.blit(self.render_text(self.font, "APPAREILS DÉTECTÉS:", CYAN_ICE), (15, y_offset))
+        return overlay
+    
+    def info_values(self, scanner, devices):
+        """Textes variables du panneau: [(police, texte, couleur, position)]"""
+        panel_x = 30
+        panel_y = 30
+        values = []
+        
+        # Informations générales (les libellés sont dans le calque)
+        online = sum(1 for d in devices if d.is_online)
+        y_offset = panel_y + 70
+        for value in (scanner.network, str(len(devices)), str(online), str(len(devices) - online)):
+            values.append((self.font, value, WHITE, (panel_x + 120, y_offset)))
+            y_offset += 28
+        
+        # Liste des appareils
+        y_offset += 50
         
-        if len(scanner.devices) == 0:
-            no_device = self.font_small.render("Aucun appareil détecté", True, LIGHT_ICE)
-            self.screen.blit(no_device, (panel_x, y_offset))
+        if len(devices) == 0:
+            values.append((self.font_small, "Aucun appareil détecté", LIGHT_ICE, (panel_x, y_offset)))
         else:
-            for ip, device in list(scanner.devices.items())[:10]:  # Limite à 10
+            for device in devices[:10]:  # Limite à 10
+                ip = device.ip
                 status = "●" if device.is_online else "○"
                 color = GREEN if device.is_online else RED
-                ping = f"{device.response_time:.0f}ms" if device.is_online else "N/A"
+                stats = device.latency.stats()
+                if device.is_online and stats['avg'] is not None:
+                    ping = f"{stats['avg']:.1f}ms ±{stats['jitter'] or 0:.1f}"
+                else:
+                    ping = "N/A"
+                if stats['loss']:
+                    ping += f" {stats['loss']:.0f}%"
                 
                 # IP tronquée si trop longue
                 display_ip = ip if len(ip) <= 15 else ip[:12] + "..."
                 
-                text = self.font_small.render(f"{status} {display_ip}", True, color)
-                self.screen.blit(text, (panel_x, y_offset))
-                
-                ping_text = self.font_small.render(ping, True, LIGHT_ICE)
-                self.screen.blit(ping_text, (panel_x + 200, y_offset))
-                
+                values.append((self.font_small, f"{status} {display_ip}", color, (panel_x, y_offset)))
+                values.append((self.font_small, ping, LIGHT_ICE, (panel_x + 200, y_offset)))
                 y_offset += 22
+        return values
     
-    def draw_legend(self):
-        """Dessine la légende avec style amélioré"""
-        legend_x = WIDTH - 230
-        legend_y = HEIGHT - 120
-        
-        # Fond semi-transparent
-        legend_surface = pygame.Surface((210, 100), pygame.SRCALPHA)
-        legend_surface.fill((10, 25, 50, 180))
-        self.screen.blit(legend_surface, (legend_x - 15, legend_y - 15))
+    def panel_rect(self):
+        return pygame.Rect(15, 15, 350, 350)
+    
+    def draw_info_panel(self, values):
+        """Dessine le panneau d'informations avec style amélioré"""
+        if self.info_overlay is None:
+            self.info_overlay = self.build_info_overlay()
+        self.screen.blit(self.info_overlay, self.panel_rect())
+        for font, text, color, position in values:
+            self.screen.blit(self.render_text(font, text, color), position)
+    
+    def build_legend_overlay(self):
+        """Calque de la légende (entièrement statique)"""
+        overlay = pygame.Surface((210, 100), pygame.SRCALPHA)
+        overlay.fill((10, 25, 50, 180))
         
         # Bordure
-        pygame.draw.rect(self.screen, CYAN_ICE, 
-                        (legend_x - 15, legend_y - 15, 210, 100), 2)
+        pygame.draw.rect(overlay, CYAN_ICE, (0, 0, 210, 100), 2)
         
         # Titre
-        title = self.font.render("LÉGENDE", True, CYAN_ICE)
-        self.screen.blit(title, (legend_x, legend_y - 5))
+        overlay.blit(self.render_text(self.font, "LÉGENDE", CYAN_ICE), (15, 10))
         
         # Icônes et labels
-        pygame.draw.circle(self.screen, GREEN, (legend_x + 10, legend_y + 30), 7)
-        pygame.draw.circle(self.screen, WHITE, (legend_x + 10, legend_y + 30), 9, 1)
-        text = self.font_small.render("En ligne", True, WHITE)
-        self.screen.blit(text, (legend_x + 30, legend_y + 22))
-        
-        pygame.draw.circle(self.screen, RED, (legend_x + 10, legend_y + 55), 7)
-        pygame.draw.circle(self.screen, WHITE, (legend_x + 10, legend_y + 55), 9, 1)
-        text = self.font_small.render("Hors ligne", True, WHITE)
-        self.screen.blit(text, (legend_x + 30, legend_y + 47))
+        pygame.draw.circle(overlay, GREEN, (25, 45), 7)
+        pygame.draw.circle(overlay, WHITE, (25, 45), 9, 1)
+        overlay.blit(self.render_text(self.font_small, "En ligne", WHITE), (45, 37))
+        
+        pygame.draw.circle(overlay, RED, (25, 70), 7)
+        pygame.draw.circle(overlay, WHITE, (25, 70), 9, 1)
+        overlay.blit(self.render_text(self.font_small, "Hors ligne", WHITE), (45, 62))
+        return overlay
+    
+    def legend_rect(self):
+        return pygame.Rect(self.width - 245, self.height - 135, 210, 100)
+    
+    def draw_legend(self):
+        """Dessine la légende avec style amélioré"""
+        if self.legend_overlay is None:
+            self.legend_overlay = self.build_legend_overlay()
+        self.screen.blit(self.legend_overlay, self.legend_rect())
+    
+    def draw_frame(self, scanner, dt):
+        """Redessine uniquement les zones modifiées (tout l'écran après un redimensionnement)"""
+        if self.background is None:
+            self.background = self.build_background()
+        devices = list(scanner.devices.values())
+        info = self.info_values(scanner, devices)
+        panel_rect = self.panel_rect()
+        legend_rect = self.legend_rect()
+        
+        # Zones touchées par le balayage et les appareils à cette image
+        rects = [self.sweep_rect()] + [self.device_rect(d) for d in devices]
+        full = self.full_redraw or not DIRTY_RECTS
+        if full:
+            dirty = [self.screen.get_rect()]
+            panel_dirty = legend_dirty = True
+        else:
+            dirty = rects + self.previous_rects
+            # Les calques semi-transparents sont redessinés sur un fond restauré
+            panel_dirty = info != self.panel_key or panel_rect.collidelist(dirty) != -1
+            legend_dirty = legend_rect.collidelist(dirty) != -1
+            if panel_dirty:
+                dirty.append(panel_rect)
+            if legend_dirty:
+                dirty.append(legend_rect)
+            if len(dirty) > 40:
+                dirty = [dirty[0].unionall(dirty[1:])]
+        
+        # Restaure le calque statique sous les zones à redessiner
+        for rect in dirty:
+            self.screen.blit(self.background, rect, rect)
+        
+        self.draw_sweep(dt)
+        for device in devices:
+            self.draw_device(device)
+        if panel_dirty:
+            self.draw_info_panel(info)
+        if legend_dirty:
+            self.draw_legend()
+        
+        if full:
+            pygame.display.flip()
+        else:
+            pygame.display.update(dirty)
+        self.full_redraw = False
+        self.previous_rects = rects
+        self.panel_key = info
+    
+    def target_fps(self):
+        """Cadence adaptée: réduite sans focus, fenêtre réduite ou sans interaction"""
+        if not pygame.display.get_active():
+            return HIDDEN_FPS
+        if not pygame.key.get_focused():
+            return BACKGROUND_FPS
+        if time.monotonic() - self.last_input > IDLE_AFTER:
+            return IDLE_FPS
+        return FPS
     
     def run(self, scanner):
         """Boucle principale d'affichage"""
@@ -506,10 +692,18 @@ class RadarDisplay:
         scan_thread = threading.Thread(target=scanner.start_scanning, daemon=True)
         scan_thread.start()
         
+        dt = 0
         while running:
             for event in pygame.event.get():
+                if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                    self.last_input = time.monotonic()
                 if event.type == pygame.QUIT:
                     running = False
+                elif event.type == pygame.VIDEORESIZE:
+                    self.screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
+                    self.resize(*event.size)
+                elif event.type == pygame.VIDEOEXPOSE:
+                    self.full_redraw = True
                 elif event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         running = False
@@ -520,25 +714,8 @@ class RadarDisplay:
                         scan_thread = threading.Thread(target=scanner.start_scanning, daemon=True)
                         scan_thread.start()
             
-            # Affichage avec fond bleu glacial
-            self.screen.fill(ICE_BLUE)
-            
-            self.draw_radar_grid()
-            self.draw_sweep()
-            
-            # Dessine les appareils
-            for device in scanner.devices.values():
-                self.draw_device(device)
-            
-            self.draw_info_panel(scanner)
-            self.draw_legend()
-            
-            # Instructions en bas
-            instructions = self.font.render("R: Nouveau scan | ESC: Quitter", True, PALE_ICE)
-            self.screen.blit(instructions, (WIDTH // 2 - 140, HEIGHT - 35))
-            
-            pygame.display.flip()
-            self.clock.tick(FPS)
+            self.draw_frame(scanner, dt)
+            dt = self.clock.tick(self.target_fps()) / 1000
         
         scanner.stop_scanning()
         pygame.quit()
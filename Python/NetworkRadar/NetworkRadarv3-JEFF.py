@@ -11,11 +11,42 @@ import math
 import threading
 import time
 import socket
-import subprocess
-import re
 import platform
 import ipaddress
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import bisect
+import os
+import sys
+
+# Modules communs (Python/netcommon), à côté du dossier de l'outil
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from icmp_probe import create_probe_engine
+from netcommon.neighbours import NeighbourTable
+from netcommon.oui import lookup_vendor
+from netcommon.passive import create_passive_listener
+from netcommon.resolver import ReverseResolver
+from scan_pipeline import ScanPipeline
+from scan_planner import plan_scan
+
+# Concurrence de chaque étape du pipeline de scan
+DNS_CONCURRENCY = 32
+MAC_CONCURRENCY = 16
+RESCAN_DELAY = 30  # secondes entre deux balayages
+DNS_TIMEOUT = 1.0  # délai max d'une résolution inverse
+PASSIVE_DISCOVERY = os.getenv('RADAR_PASSIVE', '1') != '0'  # écoute ARP/mDNS/DHCP entre deux scans
+PASSIVE_DEVICE_TTL = 600  # secondes: appareil vu passivement conservé d'un scan à l'autre
+
+# Colonnes de la liste des appareils: (titre, largeur, ancrage)
+DEVICE_COLUMNS = {
+    'icon': ('', 30, tk.CENTER),
+    'ip': ('IP', 105, tk.W),
+    'hostname': ('Nom', 90, tk.W),
+    'vendor': ('Vendor', 70, tk.W),
+    'rtt': ('RTT', 50, tk.E),
+    'mac': ('MAC', 120, tk.W),
+}
+DISPLAY_COLUMNS = ('icon', 'ip', 'hostname', 'vendor', 'rtt')  # MAC visible dans le status
 
 class WifiRadarScanner:
     def __init__(self, root):
@@ -34,12 +65,31 @@ class WifiRadarScanner:
         self.devices = []
         self.angle = 0
         self.scanning = False
-        self.radar_lines = []
+        self.sweep_items = []  # ligne principale + traînée, créées une seule fois
+        self.device_items = {}  # ip -> items du marqueur (pulsation, point, lien, icône, nom)
+        self.device_positions = {}  # ip -> (x, y, phase de pulsation)
+        self.geometry = None  # (centre x, centre y, rayon max) du canvas
         self.scan_progress = 0
+        self.scan_metrics = {}
+        self.sort_column = 'ip'
+        self.sort_reverse = False
+        self.row_keys = []  # (clé de tri, ip) en ordre croissant, miroir des lignes
         
         # Détecter l'OS
         self.os_type = platform.system()
         
+        # Moteur de sonde (socket ICMP ou repli ping)
+        self.probe = create_probe_engine(rate=2000, workers=50)
+        
+        # Table des voisins du noyau (IP -> MAC), relue une fois par cycle
+        self.neighbours = NeighbourTable()
+        
+        # Résolveur DNS inverse avec cache (les rescans ne refont pas les requêtes)
+        self.resolver = ReverseResolver(workers=DNS_CONCURRENCY, timeout=DNS_TIMEOUT)
+        
+        # Écoute passive ARP/mDNS/DHCP, active pendant le scan
+        self.passive = None
+        
         # Configuration de l'interface
         self.setup_ui()
         
@@ -74,19 +124,52 @@ class WifiRadarScanner:
         scrollbar = tk.Scrollbar(list_frame, bg='#003300', troughcolor=self.bg_color)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Text widget pour la liste
-        self.device_list = tk.Text(
+        # Style de la liste (vert sur noir)
+        style = ttk.Style(self.root)
+        style.configure(
+            'Radar.Treeview',
+            background='#001100',
+            fieldbackground='#001100',
+            foreground=self.text_color,
+            font=('Courier', 9),
+            rowheight=20
+        )
+        style.configure(
+            'Radar.Treeview.Heading',
+            background='#003300',
+            foreground=self.text_color,
+            font=('Courier', 9, 'bold')
+        )
+        style.map('Radar.Treeview', background=[('selected', '#004400')])
+        
+        # Liste des appareils: Tk ne dessine que les lignes visibles
+        self.device_list = ttk.Treeview(
+            list_frame,
+            columns=list(DEVICE_COLUMNS),
+            displaycolumns=DISPLAY_COLUMNS,
+            show='headings',
+            selectmode='browse',
+            style='Radar.Treeview',
+            yscrollcommand=scrollbar.set
+        )
+        for column, (title, width, anchor) in DEVICE_COLUMNS.items():
+            self.device_list.heading(column, text=title,
+                                     command=lambda c=column: self.sort_devices(c))
+            self.device_list.column(column, width=width, minwidth=20, anchor=anchor,
+                                    stretch=column == 'hostname')
+        self.device_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.device_list.bind('<<TreeviewSelect>>', self.on_device_selected)
+        scrollbar.config(command=self.device_list.yview)
+        
+        # Message affiché tant que la liste est vide
+        self.placeholder = tk.Label(
             list_frame,
             bg='#001100',
             fg=self.text_color,
             font=('Courier', 9),
-            wrap=tk.WORD,
-            yscrollcommand=scrollbar.set,
-            relief=tk.SOLID,
-            borderwidth=2
+            justify=tk.LEFT
         )
-        self.device_list.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.device_list.yview)
+        self.update_sort_headings()
         
         # Boutons de contrôle
         button_frame = tk.Frame(left_frame, bg=self.bg_color)
@@ -135,6 +218,16 @@ class WifiRadarScanner:
         )
         self.device_count_label.pack(pady=5)
         
+        # Mesures du dernier balayage
+        self.metrics_label = tk.Label(
+            left_frame,
+            text="1er appareil: -- | Total: --",
+            bg=self.bg_color,
+            fg=self.text_color,
+            font=('Courier', 9)
+        )
+        self.metrics_label.pack(pady=5)
+        
         # Frame droit pour le radar
         right_frame = tk.Frame(main_frame, bg=self.bg_color)
         right_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True)
@@ -148,23 +241,24 @@ class WifiRadarScanner:
         )
         self.canvas.pack(fill=tk.BOTH, expand=True)
         
-        # Dessiner le radar initial
-        self.root.after(100, self.draw_radar_base)
+        # Base du radar redessinée à chaque redimensionnement
+        self.canvas.bind('<Configure>', lambda event: self.draw_radar_base())
         
     def draw_radar_base(self):
         """Dessine la base du radar (cercles concentriques)"""
-        self.canvas.delete("all")
+        self.canvas.delete('base')
         
         width = self.canvas.winfo_width()
         height = self.canvas.winfo_height()
         
         if width < 10 or height < 10:
-            self.root.after(100, self.draw_radar_base)
+            self.geometry = None
             return
             
         center_x = width // 2
         center_y = height // 2
         max_radius = min(width, height) // 2 - 30
+        self.geometry = (center_x, center_y, max_radius)
         
         # Dessiner les cercles concentriques
         for i in range(1, 5):
@@ -173,7 +267,8 @@ class WifiRadarScanner:
                 center_x - radius, center_y - radius,
                 center_x + radius, center_y + radius,
                 outline=self.radar_color,
-                width=1
+                width=1,
+                tags='base'
             )
         
         # Dessiner les lignes de grille (croix)
@@ -181,13 +276,15 @@ class WifiRadarScanner:
             center_x, center_y - max_radius,
             center_x, center_y + max_radius,
             fill=self.radar_color,
-            width=1
+            width=1,
+            tags='base'
         )
         self.canvas.create_line(
             center_x - max_radius, center_y,
             center_x + max_radius, center_y,
             fill=self.radar_color,
-            width=1
+            width=1,
+            tags='base'
         )
         
         # Lignes diagonales
@@ -197,14 +294,16 @@ class WifiRadarScanner:
             center_x + offset, center_y + offset,
             fill=self.radar_color,
             width=1,
-            dash=(2, 4)
+            dash=(2, 4),
+            tags='base'
         )
         self.canvas.create_line(
             center_x - offset, center_y + offset,
             center_x + offset, center_y - offset,
             fill=self.radar_color,
             width=1,
-            dash=(2, 4)
+            dash=(2, 4),
+            tags='base'
         )
         
         # Dessiner le point central
@@ -212,7 +311,8 @@ class WifiRadarScanner:
             center_x - 5, center_y - 5,
             center_x + 5, center_y + 5,
             fill=self.radar_color,
-            outline=self.radar_color
+            outline=self.radar_color,
+            tags='base'
         )
         
         # Label du radar
@@ -220,7 +320,8 @@ class WifiRadarScanner:
             center_x, 20,
             text="RADAR RÉSEAU WiFi",
             fill=self.text_color,
-            font=('Courier', 14, 'bold')
+            font=('Courier', 14, 'bold'),
+            tags='base'
         )
         
         # Labels des distances
@@ -230,60 +331,64 @@ class WifiRadarScanner:
                 center_x + radius + 5, center_y + 5,
                 text=f"{i*25}m",
                 fill=self.radar_color,
-                font=('Courier', 8)
+                font=('Courier', 8),
+                tags='base'
             )
         
-    def animate_radar(self):
-        """Animation du balayage radar"""
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
+        # Balayage et appareils: items conservés, repositionnés pour la nouvelle taille
+        self.canvas.tag_lower('base')
+        self.layout_devices()
         
-        if width < 10 or height < 10:
-            self.root.after(50, self.animate_radar)
-            return
-            
-        center_x = width // 2
-        center_y = height // 2
-        max_radius = min(width, height) // 2 - 30
-        
-        # Effacer les anciennes lignes de balayage
-        for line in self.radar_lines:
-            try:
-                self.canvas.delete(line)
-            except:
-                pass
-        self.radar_lines.clear()
-        
-        # Dessiner la ligne de balayage principale
-        end_x = center_x + max_radius * math.cos(math.radians(self.angle))
-        end_y = center_y + max_radius * math.sin(math.radians(self.angle))
-        
-        main_line = self.canvas.create_line(
-            center_x, center_y, end_x, end_y,
+    def create_sweep_items(self):
+        """Ligne de balayage principale et traînée, créées une seule fois"""
+        self.sweep_items.append(self.canvas.create_line(
+            0, 0, 0, 0,
             fill=self.radar_color,
-            width=3
-        )
-        self.radar_lines.append(main_line)
+            width=3,
+            tags='sweep'
+        ))
         
         # Effet de traînée (lignes semi-transparentes)
         for i in range(1, 8):
-            fade_angle = self.angle - i * 8
-            fade_end_x = center_x + max_radius * math.cos(math.radians(fade_angle))
-            fade_end_y = center_y + max_radius * math.sin(math.radians(fade_angle))
-            
             # Calculer l'intensité de la couleur verte
             intensity = int(255 * (1 - i/8))
             fade_color = f'#{0:02x}{intensity:02x}{0:02x}'
-            
-            fade_line = self.canvas.create_line(
-                center_x, center_y, fade_end_x, fade_end_y,
+            self.sweep_items.append(self.canvas.create_line(
+                0, 0, 0, 0,
                 fill=fade_color,
-                width=max(1, 3 - i // 2)
+                width=max(1, 3 - i // 2),
+                tags='sweep'
+            ))
+        self.canvas.tag_raise('device')
+    
+    def animate_radar(self):
+        """Animation du balayage radar: déplace les items existants"""
+        if self.geometry is None:
+            self.root.after(50, self.animate_radar)
+            return
+        
+        center_x, center_y, max_radius = self.geometry
+        if not self.sweep_items:
+            self.create_sweep_items()
+        
+        # Ligne principale puis traînée, 8° d'écart entre chaque ligne
+        for i, item in enumerate(self.sweep_items):
+            angle = math.radians(self.angle - i * 8)
+            self.canvas.coords(
+                item, center_x, center_y,
+                center_x + max_radius * math.cos(angle),
+                center_y + max_radius * math.sin(angle)
             )
-            self.radar_lines.append(fade_line)
         
-        # Dessiner les appareils détectés
-        self.draw_devices()
+        # Pulsation des appareils (seul le cercle externe bouge)
+        now = time.time()
+        for ip, (device_x, device_y, phase) in self.device_positions.items():
+            pulse_size = 12 + 3 * math.sin(now * 2 + phase)
+            self.canvas.coords(
+                self.device_items[ip][0],
+                device_x - pulse_size, device_y - pulse_size,
+                device_x + pulse_size, device_y + pulse_size
+            )
         
         # Incrémenter l'angle
         self.angle = (self.angle + 3) % 360
@@ -291,78 +396,83 @@ class WifiRadarScanner:
         # Continuer l'animation
         self.root.after(50, self.animate_radar)
         
-    def draw_devices(self):
-        """Dessine les appareils sur le radar"""
-        # Supprimer les anciens marqueurs d'appareils
-        self.canvas.delete('device')
-        
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-        
-        if width < 10 or height < 10:
-            return
-            
-        center_x = width // 2
-        center_y = height // 2
-        max_radius = min(width, height) // 2 - 30
-        
-        for i, device in enumerate(self.devices):
-            # Positionner l'appareil de manière circulaire
-            angle = (i * 360 / max(len(self.devices), 1)) % 360
-            distance = max_radius * 0.65  # 65% du rayon max
-            
-            device_x = center_x + distance * math.cos(math.radians(angle))
-            device_y = center_y + distance * math.sin(math.radians(angle))
-            
+    def sync_device_markers(self):
+        """Crée ou supprime les marqueurs quand l'ensemble des appareils change"""
+        current = {device['ip'] for device in self.devices}
+        for ip in list(self.device_items):
+            if ip not in current:
+                for item in self.device_items.pop(ip):
+                    self.canvas.delete(item)
+                self.device_positions.pop(ip, None)
+        
+        for device in self.devices:
+            if device['ip'] in self.device_items:
+                continue
             # Effet de pulsation (cercle externe)
-            pulse_size = 12 + 3 * math.sin(time.time() * 2 + i)
-            self.canvas.create_oval(
-                device_x - pulse_size, device_y - pulse_size,
-                device_x + pulse_size, device_y + pulse_size,
+            pulse = self.canvas.create_oval(
+                0, 0, 0, 0,
                 outline=self.radar_color,
                 width=1,
                 tags='device'
             )
-            
-            # Dessiner le point de l'appareil
-            self.canvas.create_oval(
-                device_x - 6, device_y - 6,
-                device_x + 6, device_y + 6,
+            # Point de l'appareil
+            dot = self.canvas.create_oval(
+                0, 0, 0, 0,
                 fill='#00FF00',
                 outline='#FFFFFF',
                 width=2,
                 tags='device'
             )
-            
             # Ligne de connexion au centre
-            self.canvas.create_line(
-                center_x, center_y,
-                device_x, device_y,
+            link = self.canvas.create_line(
+                0, 0, 0, 0,
                 fill=self.radar_color,
                 width=1,
                 dash=(2, 4),
                 tags='device'
             )
-            
             # Icône selon le type d'appareil
-            icon = self.get_device_icon(device)
-            self.canvas.create_text(
-                device_x, device_y - 22,
-                text=icon,
+            icon = self.canvas.create_text(
+                0, 0,
+                text=self.get_device_icon(device),
                 fill=self.text_color,
                 font=('Arial', 16),
                 tags='device'
             )
-            
             # Nom court de l'appareil
-            short_name = device.get('hostname', 'N/A')[:12]
-            self.canvas.create_text(
-                device_x, device_y + 20,
-                text=short_name,
+            name = self.canvas.create_text(
+                0, 0,
+                text=device.get('hostname', 'N/A')[:12],
                 fill=self.text_color,
                 font=('Courier', 7),
                 tags='device'
             )
+            self.device_items[device['ip']] = (pulse, dot, link, icon, name)
+        
+        self.layout_devices()
+    
+    def layout_devices(self):
+        """Place les marqueurs en cercle (après un ajout, un retrait ou un redimensionnement)"""
+        if self.geometry is None:
+            return
+        center_x, center_y, max_radius = self.geometry
+        distance = max_radius * 0.65  # 65% du rayon max
+        
+        for i, device in enumerate(self.devices):
+            items = self.device_items.get(device['ip'])
+            if items is None:
+                continue
+            # Positionner l'appareil de manière circulaire
+            angle = (i * 360 / max(len(self.devices), 1)) % 360
+            device_x = center_x + distance * math.cos(math.radians(angle))
+            device_y = center_y + distance * math.sin(math.radians(angle))
+            self.device_positions[device['ip']] = (device_x, device_y, i)
+            
+            _, dot, link, icon, name = items
+            self.canvas.coords(dot, device_x - 6, device_y - 6, device_x + 6, device_y + 6)
+            self.canvas.coords(link, center_x, center_y, device_x, device_y)
+            self.canvas.coords(icon, device_x, device_y - 22)
+            self.canvas.coords(name, device_x, device_y + 20)
     
     def get_device_icon(self, device):
         """Retourne une icône selon le type d'appareil"""
@@ -396,9 +506,14 @@ class WifiRadarScanner:
             self.scan_button.config(text="■ ARRÊTER SCAN", bg='#330000')
             self.status_label.config(text="Status: Scan en cours...")
             self.progress_bar['value'] = 0
+            if PASSIVE_DISCOVERY and self.passive is None:
+                self.passive = create_passive_listener(on_change=self.on_passive_device)
             threading.Thread(target=self.scan_network, daemon=True).start()
         else:
             self.scanning = False
+            if self.passive is not None:
+                self.passive.stop()
+                self.passive = None
             self.scan_button.config(text="▶ DÉMARRER SCAN", bg='#003300')
             self.status_label.config(text="Status: Scan arrêté")
     
@@ -418,219 +533,228 @@ class WifiRadarScanner:
     
     def is_host_alive(self, ip):
         """Vérifie si un hôte est accessible"""
-        try:
-            # Utiliser ping selon l'OS
-            if self.os_type == "Windows":
-                command = ["ping", "-n", "1", "-w", "500", ip]
-            else:
-                command = ["ping", "-c", "1", "-W", "1", ip]
-            
-            result = subprocess.run(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                timeout=2
-            )
-            return result.returncode == 0
-        except:
-            return False
+        return self.probe.ping(ip)[0]
+    
+    @staticmethod
+    def fallback_name(ip):
+        """Nom affiché sans DNS inverse ni nom annoncé"""
+        return f"Device-{ip.split('.')[-1]}"
     
     def get_hostname(self, ip):
         """Obtient le nom d'hôte à partir de l'IP"""
-        try:
-            hostname = socket.gethostbyaddr(ip)[0]
-            return hostname
-        except:
-            return f"Device-{ip.split('.')[-1]}"
+        return self.resolver.resolve(ip, default=self.fallback_name(ip))
+    
+    async def resolve_hostname(self, device):
+        """Étape DNS du pipeline, sans bloquer la boucle asyncio"""
+        ip = device['ip']
+        return await self.resolver.resolve_async(ip, default=self.fallback_name(ip))
     
     def get_mac_address(self, ip):
-        """Obtient l'adresse MAC (Windows/Linux)"""
-        try:
-            if self.os_type == "Windows":
-                # Utiliser arp -a sur Windows
-                result = subprocess.run(
-                    ["arp", "-a", ip],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                output = result.stdout
-                
-                # Rechercher le format MAC Windows (xx-xx-xx-xx-xx-xx)
-                mac_pattern = r'([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})'
-                match = re.search(mac_pattern, output)
-                if match:
-                    return match.group(0).replace('-', ':')
-            else:
-                # Utiliser arp sur Linux/Mac
-                result = subprocess.run(
-                    ["arp", "-n", ip],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                output = result.stdout
-                mac_pattern = r'([0-9A-Fa-f]{2}:){5}[0-9A-Fa-f]{2}'
-                match = re.search(mac_pattern, output)
-                if match:
-                    return match.group(0)
-        except:
-            pass
-        return "N/A"
+        """Obtient l'adresse MAC depuis la table des voisins (Windows/Linux)"""
+        return self.neighbours.lookup(ip) or "N/A"
     
     def get_vendor_from_mac(self, mac):
-        """Base de données simplifiée des fabricants"""
+        """Fabricant depuis la base IEEE (index chargé au premier appel)"""
         if mac == "N/A":
             return "Inconnu"
-        
-        mac_upper = mac.upper().replace(':', '').replace('-', '')[:6]
-        
-        vendors = {
-            '001A11': 'Google',
-            '0050F2': 'Microsoft',
-            'DCA632': 'Raspberry Pi',
-            'B827EB': 'Raspberry Pi',
-            'D83ADD': 'Raspberry Pi',
-            '000A95': 'Apple',
-            '00039': 'Apple',
-            '001B63': 'Apple',
-            '28CDC4': 'Apple',
-            '001EC2': 'Apple',
-            '001F3C': 'Samsung',
-            '0015B9': 'TP-Link',
-            '00059A': 'Cisco',
-            'E84E06': 'TP-Link',
-            '50C7BF': 'TP-Link',
-            'A036BC': 'D-Link',
-            '001D0F': 'Dell',
-            '00237D': 'Huawei',
-        }
-        
-        for prefix, vendor in vendors.items():
-            if mac_upper.startswith(prefix):
-                return vendor
-        
-        return "Inconnu"
+        return lookup_vendor(mac) or "Inconnu"
     
     def scan_network(self):
-        """Scanne le réseau pour trouver les appareils"""
+        """Scanne le réseau en boucle tant que le scan est actif"""
         try:
-            # Obtenir l'IP locale
-            local_ip = self.get_local_ip()
-            
-            if not local_ip:
-                self.update_status("Erreur: Impossible de détecter votre IP")
-                self.scanning = False
-                self.scan_button.config(text="▶ DÉMARRER SCAN", bg='#003300')
-                return
-            
-            # Calculer le réseau
-            ip_parts = local_ip.split('.')
-            network_base = '.'.join(ip_parts[:3])
-            
-            self.update_status(f"Scan du réseau {network_base}.0/24...")
-            self.devices.clear()
-            
-            # Scanner les 254 adresses possibles
-            alive_hosts = []
-            
-            # Utiliser ThreadPoolExecutor pour scanner en parallèle
-            with ThreadPoolExecutor(max_workers=50) as executor:
-                futures = {}
+            while self.scanning:
+                # Interfaces locales + RADAR_CIDRS - RADAR_EXCLUDE, replanifié à chaque
+                # cycle (changement de réseau WiFi, VPN...)
+                local_ip = self.get_local_ip()
+                plan = plan_scan(default=f"{local_ip}/24" if local_ip else None)
+                addresses = list(plan.hosts())
                 
-                for i in range(1, 255):
-                    if not self.scanning:
-                        break
-                    
-                    ip = f"{network_base}.{i}"
-                    future = executor.submit(self.is_host_alive, ip)
-                    futures[future] = ip
+                if not addresses:
+                    self.update_status("Erreur: Impossible de détecter votre IP")
+                    self.scanning = False
+                    self.root.after(0, lambda: self.scan_button.config(text="▶ DÉMARRER SCAN", bg='#003300'))
+                    return
+                
+                self.update_status(f"Scan de {plan.describe()} ({len(addresses)} IPs)...")
+                self.clear_devices()
+                self.update_progress(0)
+                
+                metrics = asyncio.run(self.run_pipeline(addresses))
+                self.update_metrics(metrics.as_dict())
                 
-                # Collecter les résultats
-                completed = 0
-                for future in as_completed(futures):
-                    if not self.scanning:
-                        break
-                    
-                    ip = futures[future]
-                    try:
-                        if future.result():
-                            alive_hosts.append(ip)
-                            self.update_status(f"Trouvé: {ip}")
-                    except:
-                        pass
-                    
-                    completed += 1
-                    progress = (completed / 254) * 100
-                    self.update_progress(progress)
-            
-            if not self.scanning:
-                self.update_status("Scan annulé")
-                return
-            
-            # Obtenir les détails de chaque hôte vivant
-            self.update_status("Collecte des informations...")
-            
-            for ip in alive_hosts:
                 if not self.scanning:
-                    break
+                    self.update_status("Scan annulé")
+                    return
                 
-                hostname = self.get_hostname(ip)
-                mac = self.get_mac_address(ip)
-                vendor = self.get_vendor_from_mac(mac)
+                self.update_device_count()
+                self.update_status(f"Scan terminé: {metrics.enriched} appareils trouvés")
+                self.update_progress(100)
                 
-                device_info = {
-                    'ip': ip,
-                    'mac': mac,
-                    'hostname': hostname,
-                    'vendor': vendor
-                }
-                self.devices.append(device_info)
-            
-            # Mettre à jour l'affichage
-            self.update_device_list()
-            self.update_device_count()
-            self.update_status(f"Scan terminé: {len(self.devices)} appareils trouvés")
-            self.update_progress(100)
+                # Rescanner après RESCAN_DELAY secondes si toujours actif
+                deadline = time.monotonic() + RESCAN_DELAY
+                while self.scanning and time.monotonic() < deadline:
+                    time.sleep(0.5)
             
-            # Rescanner après 30 secondes si toujours actif
-            if self.scanning:
-                time.sleep(30)
-                if self.scanning:
-                    self.scan_network()
-            else:
-                self.scan_button.config(text="▶ DÉMARRER SCAN", bg='#003300')
+            self.root.after(0, lambda: self.scan_button.config(text="▶ DÉMARRER SCAN", bg='#003300'))
             
         except Exception as e:
             self.update_status(f"Erreur: {str(e)}")
             self.scanning = False
-            self.scan_button.config(text="▶ DÉMARRER SCAN", bg='#003300')
+            self.root.after(0, lambda: self.scan_button.config(text="▶ DÉMARRER SCAN", bg='#003300'))
+    
+    async def run_pipeline(self, addresses):
+        """Sonde -> DNS -> MAC -> fabricant, appareils publiés au fil de l'eau"""
+        pipeline = ScanPipeline(
+            self.probe,
+            stages=[
+                ('hostname', self.resolve_hostname, DNS_CONCURRENCY),
+                ('mac', lambda d: self.get_mac_address(d['ip']), MAC_CONCURRENCY),
+                ('vendor', lambda d: self.get_vendor_from_mac(d['mac']), 1),
+            ],
+            on_device=self.add_device,
+            on_progress=lambda fraction: self.update_progress(fraction * 100),
+            cancel=lambda: not self.scanning,
+        )
+        return await pipeline.run(addresses)
     
-    def update_device_list(self):
-        """Met à jour la liste des appareils dans l'interface"""
+    def clear_devices(self):
+        """Vide la liste avant un nouveau balayage (appareils vus passivement conservés)"""
         def update():
-            self.device_list.config(state=tk.NORMAL)
-            self.device_list.delete(1.0, tk.END)
-            
-            if not self.devices:
-                self.device_list.insert(tk.END, "\n  Aucun appareil détecté.\n\n  Lancez un scan pour détecter\n  les appareils sur votre réseau.\n")
-            else:
-                for i, device in enumerate(self.devices, 1):
-                    icon = self.get_device_icon(device)
-                    device_text = f"\n{icon} APPAREIL #{i}\n"
-                    device_text += f"{'═' * 35}\n"
-                    device_text += f"IP:       {device['ip']}\n"
-                    device_text += f"MAC:      {device['mac']}\n"
-                    device_text += f"Nom:      {device['hostname']}\n"
-                    device_text += f"Vendor:   {device['vendor']}\n"
-                    device_text += f"{'═' * 35}\n"
-                    
-                    self.device_list.insert(tk.END, device_text)
-            
-            self.device_list.config(state=tk.DISABLED)
-        
+            self.devices.clear()
+            self.sync_device_markers()
+            self.device_list.delete(*self.device_list.get_children())
+            self.row_keys.clear()
+            self.show_placeholder("\n  Recherche d'appareils...\n")
+            self.device_count_label.config(text="Appareils: 0")
+            if self.passive is not None:
+                for info in self.passive.recent(PASSIVE_DEVICE_TTL):
+                    self.merge_passive_device(info)
         self.root.after(0, update)
     
+    def add_device(self, device_info):
+        """Publie un appareil enrichi dans l'interface dès qu'il est prêt"""
+        self.root.after(0, lambda: self.merge_device(device_info))
+    
+    def merge_device(self, device_info):
+        """Ajoute l'appareil, ou met à jour celui de même IP (thread Tk)"""
+        existing = next((d for d in self.devices if d['ip'] == device_info['ip']), None)
+        if device_info.get('hostname') == self.fallback_name(device_info['ip']):
+            # Pas de DNS inverse: nom annoncé en DHCP/mDNS, sinon nom déjà connu
+            announced = self.passive.hostname(device_info.get('mac')) if self.passive is not None else None
+            if announced:
+                device_info = dict(device_info, hostname=announced)
+            elif existing is not None:
+                device_info = {k: v for k, v in device_info.items() if k != 'hostname'}
+        if existing is None:
+            self.devices.append(device_info)
+            self.sync_device_markers()
+            self.device_count_label.config(text=f"Appareils: {len(self.devices)}")
+        else:
+            existing.update(device_info)
+            device_info = existing
+            _, _, _, icon, name = self.device_items[device_info['ip']]
+            self.canvas.itemconfig(icon, text=self.get_device_icon(device_info))
+            self.canvas.itemconfig(name, text=device_info.get('hostname', 'N/A')[:12])
+        self.upsert_row(device_info)
+    
+    def on_passive_device(self, info):
+        """Appareil vu passivement (ARP/mDNS/DHCP), affiché sans attendre le scan"""
+        self.root.after(0, lambda: self.merge_passive_device(info))
+    
+    def merge_passive_device(self, info):
+        """Ajoute un appareil vu passivement ou complète son nom (thread Tk)"""
+        existing = next((d for d in self.devices if d['ip'] == info['ip']), None)
+        if existing is None:
+            mac = info['mac']
+            self.merge_device({
+                'ip': info['ip'],
+                'mac': mac,
+                'hostname': info['hostname'] or self.fallback_name(info['ip']),
+                'vendor': self.get_vendor_from_mac(mac),
+                'rtt': 0.0,
+            })
+        elif info['hostname']:
+            self.merge_device({'ip': info['ip'], 'hostname': info['hostname']})
+    
+    def update_metrics(self, metrics):
+        """Affiche le délai avant le premier appareil et la durée totale"""
+        self.scan_metrics = metrics
+        first = metrics['time_to_first_device']
+        first_text = f"{first:.2f}s" if first is not None else "--"
+        text = f"1er appareil: {first_text} | Total: {metrics['total_time']:.2f}s"
+        print(f"Scan: {text} ({metrics['enriched']} appareils)")
+        self.root.after(0, lambda: self.metrics_label.config(text=text))
+    
+    def show_placeholder(self, text):
+        """Affiche un message à la place de la liste vide"""
+        self.placeholder.config(text=text)
+        self.placeholder.place(relx=0, rely=0, relwidth=1, relheight=1)
+    
+    def row_values(self, device):
+        """Valeurs d'une ligne, dans l'ordre de DEVICE_COLUMNS"""
+        return (
+            self.get_device_icon(device),
+            device['ip'],
+            device['hostname'],
+            device['vendor'],
+            f"{device['rtt']:.1f}",
+            device['mac'],
+        )
+    
+    def sort_key(self, device):
+        """Clé de tri de la colonne courante"""
+        if self.sort_column == 'ip':
+            return int(ipaddress.ip_address(device['ip']))
+        if self.sort_column == 'rtt':
+            return device['rtt']
+        return str(device.get(self.sort_column, '')).lower()
+    
+    def upsert_row(self, device):
+        """Insère (ou met à jour) une ligne à sa place triée, sans toucher aux autres"""
+        ip = device['ip']
+        if self.device_list.exists(ip):
+            index = next(i for i, (_, row_ip) in enumerate(self.row_keys) if row_ip == ip)
+            del self.row_keys[index]
+        else:
+            self.device_list.insert('', tk.END, iid=ip)
+        
+        entry = (self.sort_key(device), ip)
+        position = bisect.bisect(self.row_keys, entry)
+        self.row_keys.insert(position, entry)
+        if self.sort_reverse:
+            position = len(self.row_keys) - 1 - position
+        self.device_list.item(ip, values=self.row_values(device))
+        self.device_list.move(ip, '', position)
+        self.placeholder.place_forget()
+    
+    def sort_devices(self, column):
+        """Tri par colonne (clic sur l'en-tête; second clic: ordre inverse)"""
+        if column == self.sort_column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        by_ip = {device['ip']: device for device in self.devices}
+        self.row_keys = sorted((self.sort_key(by_ip[ip]), ip) for ip in self.device_list.get_children())
+        ordered = reversed(self.row_keys) if self.sort_reverse else self.row_keys
+        for position, (_, ip) in enumerate(ordered):
+            self.device_list.move(ip, '', position)
+        self.update_sort_headings()
+    
+    def update_sort_headings(self):
+        """Flèche de tri sur l'en-tête de la colonne courante"""
+        for column, (title, _, _) in DEVICE_COLUMNS.items():
+            if column == self.sort_column:
+                title += ' ▼' if self.sort_reverse else ' ▲'
+            self.device_list.heading(column, text=title)
+    
+    def on_device_selected(self, event):
+        """Détails de l'appareil sélectionné dans le status"""
+        selection = self.device_list.selection()
+        if selection:
+            icon, ip, hostname, vendor, rtt, mac = self.device_list.item(selection[0], 'values')
+            self.status_label.config(text=f"{ip} | {mac} | {rtt} ms")
+    
     def update_device_count(self):
         """Met à jour le compteur d'appareils"""
         def update():
@@ -675,15 +799,15 @@ def main():
     app = WifiRadarScanner(root)
     
     # Message de bienvenue
-    app.device_list.config(state=tk.NORMAL)
-    app.device_list.insert(tk.END, "\n  ╔═══════════════════════════════╗\n")
-    app.device_list.insert(tk.END, "  ║  WiFi Radar Scanner v2.0  ║\n")
-    app.device_list.insert(tk.END, "  ╚═══════════════════════════════╝\n\n")
-    app.device_list.insert(tk.END, "  Cliquez sur 'DÉMARRER SCAN'\n")
-    app.device_list.insert(tk.END, "  pour commencer la détection\n")
-    app.device_list.insert(tk.END, "  des appareils sur votre réseau.\n\n")
-    app.device_list.insert(tk.END, "  Le scan peut prendre 1-2 minutes.\n")
-    app.device_list.config(state=tk.DISABLED)
+    app.show_placeholder(
+        "\n  ╔═══════════════════════════════╗\n"
+        "  ║  WiFi Radar Scanner v2.0  ║\n"
+        "  ╚═══════════════════════════════╝\n\n"
+        "  Cliquez sur 'DÉMARRER SCAN'\n"
+        "  pour commencer la détection\n"
+        "  des appareils sur votre réseau.\n\n"
+        "  Le scan peut prendre 1-2 minutes.\n"
+    )
     
     root.mainloop()
 
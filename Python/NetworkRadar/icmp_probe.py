@@ -0,0 +1,320 @@
+"""
+Moteurs de sonde ICMP pour les radars réseau
+Balayage d'un sous-réseau complet depuis une seule socket ICMP (raw ou
+SOCK_DGRAM non privilégiée), avec repli sur la commande ping système.
+Les RTT utilisent l'horodatage de réception du noyau quand il est disponible.
+"""
+
+import math
+import os
+import platform
+import re
+import select
+import socket
+import struct
+import subprocess
+import threading
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+
+# Attente après le dernier envoi: TAIL_FACTOR x le RTT max observé (au moins
+# TAIL_MIN), plafonnée par le timeout; timeout complet si aucune réponse
+TAIL_FACTOR = 4
+TAIL_MIN = 0.1
+
+# Horodatage noyau des paquets reçus (Linux, non exposé par le module socket)
+SO_TIMESTAMPNS = getattr(socket, 'SO_TIMESTAMPNS', 35)
+TIMESPEC = struct.Struct('@ll')
+
+# "time=0.045 ms" (Linux/macOS), "temps=1 ms" / "temps<1ms" (Windows FR)
+PING_TIME_RE = re.compile(r'(?:time|temps|zeit)\s*[=<]\s*([\d.,]+)\s*ms', re.IGNORECASE)
+
+
+def checksum(data):
+    """Somme de contrôle Internet (RFC 1071)"""
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total >> 16) + (total & 0xFFFF)
+    total += total >> 16
+    return ~total & 0xFFFF
+
+
+def build_echo_request(ident, seq, payload=b'radar'):
+    """Construit un paquet ICMP echo request"""
+    header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+    csum = checksum(header + payload)
+    return struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, csum, ident, seq) + payload
+
+
+class RttStats:
+    """Fenêtre glissante des derniers RTT (NaN = perte), statistiques à la demande"""
+
+    __slots__ = ('samples', 'window', 'index', '_stats')
+
+    def __init__(self, window=50):
+        self.window = window
+        self.samples = array('d')
+        self.index = 0
+        self._stats = None
+
+    def add(self, rtt):
+        """Ajoute un RTT en ms, ou None pour une sonde sans réponse"""
+        value = math.nan if rtt is None else float(rtt)
+        if len(self.samples) < self.window:
+            self.samples.append(value)
+        else:
+            self.samples[self.index] = value
+        self.index = (self.index + 1) % self.window
+        self._stats = None
+
+    def ordered(self):
+        """Échantillons du plus ancien au plus récent"""
+        if len(self.samples) < self.window:
+            return list(self.samples)
+        return list(self.samples[self.index:]) + list(self.samples[:self.index])
+
+    def stats(self):
+        """{min, avg, max, jitter, loss, count}; jitter = écart moyen entre RTT successifs"""
+        if self._stats is None:
+            samples = self.ordered()
+            received = [v for v in samples if not math.isnan(v)]
+            stats = {'min': None, 'avg': None, 'max': None, 'jitter': None,
+                     'loss': 0.0, 'count': len(samples)}
+            if samples:
+                stats['loss'] = round(100 * (len(samples) - len(received)) / len(samples), 1)
+            if received:
+                stats['min'] = round(min(received), 3)
+                stats['max'] = round(max(received), 3)
+                stats['avg'] = round(sum(received) / len(received), 3)
+            if len(received) > 1:
+                stats['jitter'] = round(
+                    sum(abs(b - a) for a, b in zip(received, received[1:])) / (len(received) - 1), 3
+                )
+            self._stats = stats
+        return self._stats
+
+
+def enable_kernel_timestamps(sock):
+    """Active SO_TIMESTAMPNS (Linux); retourne False si indisponible"""
+    if platform.system() != "Linux":
+        return False
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, SO_TIMESTAMPNS, 1)
+        return True
+    except OSError:
+        return False
+
+
+def kernel_timestamp(ancdata):
+    """Instant de réception (epoch, s) fourni par le noyau, None sinon"""
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == SO_TIMESTAMPNS and len(data) >= TIMESPEC.size:
+            seconds, nanoseconds = TIMESPEC.unpack_from(data)
+            return seconds + nanoseconds / 1e9
+    return None
+
+
+class IcmpSweeper:
+    """Sonde ICMP sur une socket unique, réponses associées par id/séquence"""
+    name = "icmp"
+
+    def __init__(self, rate=1000):
+        self.rate = rate  # paquets par seconde (0 = illimité)
+        self.ident = os.getpid() & 0xFFFF
+        self.lock = threading.Lock()
+        self.sock, self.raw = self.open_socket()
+        self.kernel_timestamps = enable_kernel_timestamps(self.sock)
+        self.seq = 0
+
+    @staticmethod
+    def open_socket():
+        """Ouvre une socket raw, sinon une socket ICMP non privilégiée"""
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            raw = True
+        except (PermissionError, OSError):
+            # Linux: autorisé si le GID est dans net.ipv4.ping_group_range
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+            raw = False
+        sock.setblocking(False)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+        except OSError:
+            pass
+        return sock, raw
+
+    def parse_reply(self, data):
+        """Retourne (ident, seq) d'un echo reply, None sinon"""
+        # Les sockets raw (et DGRAM sur macOS) incluent l'en-tête IPv4
+        if data and data[0] >> 4 == 4:
+            data = data[(data[0] & 0x0F) * 4:]
+        if len(data) < 8:
+            return None
+        icmp_type, code, _, ident, seq = struct.unpack('!BBHHH', data[:8])
+        if icmp_type != ICMP_ECHO_REPLY or code != 0:
+            return None
+        return ident, seq
+
+    def recv(self):
+        """(données, adresse, horodatage noyau ou None)"""
+        if self.kernel_timestamps:
+            data, ancdata, _, addr = self.sock.recvmsg(2048, socket.CMSG_SPACE(TIMESPEC.size))
+            return data, addr, kernel_timestamp(ancdata)
+        data, addr = self.sock.recvfrom(2048)
+        return data, addr, None
+
+    def receive(self, pending, results, on_reply):
+        """Vide la file de réception de la socket"""
+        while True:
+            try:
+                data, addr, stamp = self.recv()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            received = time.monotonic()
+            reply = self.parse_reply(data)
+            if reply is None:
+                continue
+            ident, seq = reply
+            # En SOCK_DGRAM le noyau réécrit l'identifiant et filtre pour nous
+            if self.raw and ident != self.ident:
+                continue
+            entry = pending.pop(seq, None)
+            if entry is None or entry[0] != addr[0]:
+                continue
+            ip, sent, sent_wall = entry
+            rtt = (received - sent) * 1000
+            if stamp is not None and stamp >= sent_wall:
+                # Exclut la latence de l'ordonnanceur et de la boucle Python
+                rtt = (stamp - sent_wall) * 1000
+            results[ip] = rtt
+            if on_reply:
+                on_reply(ip, rtt)
+
+    def sweep(self, addresses, timeout=1.0, cancel=None, on_reply=None, on_probed=None):
+        """Envoie un echo à chaque adresse et retourne {ip: rtt_ms} des hôtes ayant répondu
+
+        on_probed(n): nombre d'adresses déjà sondées (progression). Après le
+        dernier envoi, l'attente s'arrête dès que toutes les adresses ont
+        répondu, ou après quelques RTT (voir TAIL_FACTOR).
+        """
+        addresses = [str(ip) for ip in addresses]
+        results = {}
+        pending = {}
+        interval = 1.0 / self.rate if self.rate else 0
+        with self.lock:
+            index = 0
+            next_send = time.monotonic()
+            last_send = None
+            while True:
+                if cancel and cancel():
+                    break
+                now = time.monotonic()
+                while index < len(addresses) and now >= next_send:
+                    ip = addresses[index]
+                    index += 1
+                    self.seq = (self.seq + 1) & 0xFFFF
+                    try:
+                        self.sock.sendto(build_echo_request(self.ident, self.seq), (ip, 0))
+                        pending[self.seq] = (ip, time.monotonic(), time.time())
+                    except OSError:
+                        pass  # hôte injoignable, tampon plein...
+                    next_send = max(next_send + interval, now - 0.05) if interval else now
+                    if on_probed:
+                        on_probed(index)
+
+                if index >= len(addresses):
+                    if last_send is None:
+                        last_send = now
+                    tail = timeout
+                    if results:
+                        tail = min(timeout, max(TAIL_MIN, TAIL_FACTOR * max(results.values()) / 1000))
+                    deadline = last_send + tail
+                    if now >= deadline or not pending:
+                        break
+                    wait = deadline - now
+                else:
+                    wait = max(0, next_send - now)
+
+                readable, _, _ = select.select([self.sock], [], [], min(wait, 0.1))
+                if readable:
+                    self.receive(pending, results, on_reply)
+        return results
+
+    def ping(self, ip, timeout=1.0):
+        """Ping un seul hôte, retourne (success, response_time)"""
+        rtt = self.sweep([ip], timeout=timeout).get(str(ip))
+        return (True, rtt) if rtt is not None else (False, 0)
+
+    def close(self):
+        self.sock.close()
+
+
+class SubprocessPinger:
+    """Repli sans privilèges: un processus ping par hôte, en parallèle borné"""
+    name = "subprocess"
+
+    def __init__(self, workers=64):
+        self.workers = workers
+        self.windows = platform.system() == "Windows"
+
+    def ping(self, ip, timeout=1.0):
+        """Ping un appareil et retourne (success, response_time)"""
+        if self.windows:
+            command = ['ping', '-n', '1', '-w', str(int(timeout * 1000)), str(ip)]
+        else:
+            command = ['ping', '-c', '1', '-W', str(max(1, int(timeout))), str(ip)]
+        try:
+            start = time.monotonic()
+            result = subprocess.run(command, capture_output=True, text=True, timeout=timeout + 1)
+            if result.returncode != 0:
+                return False, 0
+            # RTT mesuré par ping lui-même, sans le coût de lancement du processus
+            match = PING_TIME_RE.search(result.stdout)
+            if match:
+                return True, float(match.group(1).replace(',', '.'))
+            return True, (time.monotonic() - start) * 1000  # en ms
+        except Exception:
+            return False, 0
+
+    def sweep(self, addresses, timeout=1.0, cancel=None, on_reply=None, on_probed=None):
+        """Ping toutes les adresses et retourne {ip: rtt_ms} des hôtes ayant répondu"""
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {}
+            for ip in addresses:
+                if cancel and cancel():
+                    break
+                futures[executor.submit(self.ping, str(ip), timeout)] = str(ip)
+            for probed, future in enumerate(as_completed(futures), 1):
+                if cancel and cancel():
+                    for pending in futures:
+                        pending.cancel()
+                    break
+                if on_probed:
+                    on_probed(probed)
+                is_online, rtt = future.result()
+                if is_online:
+                    ip = futures[future]
+                    results[ip] = rtt
+                    if on_reply:
+                        on_reply(ip, rtt)
+        return results
+
+    def close(self):
+        pass
+
+
+def create_probe_engine(rate=1000, workers=64):
+    """Retourne le moteur ICMP natif si les privilèges le permettent, sinon le repli ping"""
+    try:
+        return IcmpSweeper(rate=rate)
+    except (PermissionError, OSError) as e:
+        print(f"⚠ Socket ICMP indisponible ({e}), repli sur la commande ping")
+        return SubprocessPinger(workers=workers)
@@ -0,0 +1,122 @@
+"""
+Surveillance de la disponibilité des appareils connus
+Un seul balayage ICMP groupé par tour pour tous les appareils à vérifier, et
+un intervalle propre à chaque appareil: vérifications espacées pour les hôtes
+hors ligne depuis longtemps, rapprochées pour les hôtes instables.
+"""
+
+import threading
+import time
+from collections import deque
+
+
+class DeviceSchedule:
+    """Prochaine vérification et changements d'état récents d'un appareil"""
+
+    __slots__ = ('online', 'next_check', 'interval', 'offline_rounds', 'changes')
+
+    def __init__(self, online, next_check, interval):
+        self.online = online
+        self.next_check = next_check
+        self.interval = interval
+        self.offline_rounds = 0
+        self.changes = deque()  # instants (monotonic) des derniers changements d'état
+
+
+class LivenessMonitor:
+    """Tours de sonde groupés: la fraîcheur ne dépend pas du nombre d'appareils"""
+
+    def __init__(self, probe, interval=5, fast_interval=1, max_interval=60, timeout=1.0,
+                 backoff_after=3, flap_window=60, flap_threshold=2, on_result=None):
+        self.probe = probe
+        self.interval = interval
+        self.fast_interval = fast_interval
+        self.max_interval = max_interval
+        self.timeout = timeout
+        self.backoff_after = backoff_after
+        self.flap_window = flap_window
+        self.flap_threshold = flap_threshold
+        self.on_result = on_result
+        self.schedules = {}
+        self.lock = threading.Lock()
+        self.last_round = {'checked': 0, 'online': 0, 'duration': 0.0}
+
+    def track(self, ip, online=True):
+        """Ajoute un appareil, vérifié dès le prochain tour"""
+        with self.lock:
+            if ip not in self.schedules:
+                self.schedules[ip] = DeviceSchedule(online, time.monotonic(), self.interval)
+
+    def untrack(self, ip):
+        with self.lock:
+            self.schedules.pop(ip, None)
+
+    def due(self, now):
+        """Appareils dont la vérification est échue"""
+        with self.lock:
+            return [ip for ip, schedule in self.schedules.items() if schedule.next_check <= now]
+
+    def next_deadline(self):
+        with self.lock:
+            return min((s.next_check for s in self.schedules.values()), default=None)
+
+    def _reschedule(self, schedule, online, started):
+        """Intervalle adaptatif selon la stabilité et la durée d'indisponibilité"""
+        if online != schedule.online:
+            schedule.changes.append(started)
+            schedule.online = online
+        while schedule.changes and started - schedule.changes[0] > self.flap_window:
+            schedule.changes.popleft()
+
+        schedule.offline_rounds = 0 if online else schedule.offline_rounds + 1
+        if len(schedule.changes) >= self.flap_threshold:
+            # Appareil instable: on resserre la surveillance
+            interval = self.fast_interval
+        elif schedule.offline_rounds > self.backoff_after:
+            # Hors ligne depuis longtemps: espacement exponentiel plafonné
+            interval = min(self.max_interval,
+                           self.interval * 2 ** (schedule.offline_rounds - self.backoff_after))
+        else:
+            interval = self.interval
+        schedule.interval = interval
+        # Calé sur le début du tour: pas de dérive due à la durée du balayage
+        schedule.next_check = started + interval
+
+    def run_round(self, cancel=None):
+        """Sonde en un seul balayage tous les appareils échus; retourne {ip: rtt ou None}"""
+        started = time.monotonic()
+        addresses = self.due(started)
+        if not addresses:
+            return {}
+        replies = self.probe.sweep(addresses, timeout=self.timeout, cancel=cancel)
+
+        results = {}
+        with self.lock:
+            for ip in addresses:
+                schedule = self.schedules.get(ip)
+                if schedule is None:
+                    continue
+                rtt = replies.get(ip)
+                self._reschedule(schedule, rtt is not None, started)
+                results[ip] = rtt
+
+        self.last_round = {
+            'checked': len(addresses),
+            'online': len(replies),
+            'duration': round(time.monotonic() - started, 3),
+        }
+        if self.on_result:
+            for ip, rtt in results.items():
+                self.on_result(ip, rtt is not None, rtt or 0)
+        return results
+
+    def run(self, stopped):
+        """Boucle de surveillance jusqu'à ce que stopped() soit vrai"""
+        while not stopped():
+            self.run_round(cancel=stopped)
+            deadline = self.next_deadline()
+            delay = self.fast_interval if deadline is None else deadline - time.monotonic()
+            # Réveil par petits pas pour réagir rapidement à l'arrêt
+            end = time.monotonic() + max(0, delay)
+            while not stopped() and time.monotonic() < end:
+                time.sleep(max(0, min(0.2, end - time.monotonic())))
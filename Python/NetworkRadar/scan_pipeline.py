@@ -0,0 +1,153 @@
+"""
+Pipeline asyncio de scan réseau
+sonde -> DNS inverse -> adresse MAC -> fabricant, chaque étape en parallèle
+borné; les appareils sont publiés dès qu'ils sont enrichis
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MISSING = 'N/A'  # valeur d'une étape en échec, les étapes suivantes restent utilisables
+PROBE_SHARE = 0.8  # part de la sonde dans la progression, le reste pour l'enrichissement
+
+
+class ScanMetrics:
+    """Mesures d'un balayage (secondes depuis le début du scan)"""
+    def __init__(self):
+        self.started = time.monotonic()
+        self.first_device = None  # délai avant le premier appareil publié
+        self.total = None  # durée totale du balayage
+        self.alive = 0
+        self.enriched = 0
+        self.addresses = 0
+        self.probed = 0
+        self.probe_done = False
+        self.progress = 0.0
+
+    def advance(self):
+        """Progression croissante: sonde (adresses sondées / total) puis
+        enrichissement des hôtes vivants une fois leur nombre connu"""
+        if self.probe_done:
+            value = PROBE_SHARE + (1 - PROBE_SHARE) * (self.enriched / self.alive if self.alive else 1)
+        else:
+            value = PROBE_SHARE * self.probed / max(1, self.addresses)
+        self.progress = max(self.progress, value)
+        return self.progress
+
+    def mark_device(self):
+        self.enriched += 1
+        if self.first_device is None:
+            self.first_device = time.monotonic() - self.started
+
+    def finish(self):
+        self.total = time.monotonic() - self.started
+
+    def as_dict(self):
+        return {
+            'time_to_first_device': self.first_device,
+            'total_time': self.total,
+            'alive': self.alive,
+            'enriched': self.enriched,
+        }
+
+
+class ScanPipeline:
+    """Enchaîne les étapes d'enrichissement sur des files asyncio
+
+    stages: liste de (clé, fonction, concurrence). La fonction reçoit le
+    dictionnaire de l'appareil et retourne la valeur stockée sous `clé`;
+    elle peut être une coroutine ou une fonction bloquante (exécutée dans
+    un pool de threads dédié). Si elle échoue, `clé` vaut MISSING.
+    """
+
+    def __init__(self, probe, stages, on_device, on_progress=None, cancel=None):
+        self.probe = probe
+        self.stages = stages
+        self.on_device = on_device
+        self.on_progress = on_progress
+        self.cancel = cancel
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, sum(concurrency for _, _, concurrency in stages))
+        )
+
+    def cancelled(self):
+        return bool(self.cancel and self.cancel())
+
+    async def call(self, func, device):
+        if asyncio.iscoroutinefunction(func):
+            return await func(device)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, device)
+
+    async def stage_worker(self, key, func, inbox, outbox, metrics):
+        while True:
+            device = await inbox.get()
+            try:
+                if not self.cancelled():
+                    try:
+                        device[key] = await self.call(func, device)
+                    except Exception as e:
+                        print(f"Erreur étape {key} ({device['ip']}): {e}")
+                        device[key] = MISSING
+                    if outbox is not None:
+                        outbox.put_nowait(device)
+                    else:
+                        metrics.mark_device()
+                        self.on_device(device)
+                        self.report_progress(metrics)
+            finally:
+                inbox.task_done()
+
+    def report_progress(self, metrics):
+        if self.on_progress:
+            self.on_progress(metrics.advance())
+
+    async def run(self, addresses, timeout=1.0):
+        """Exécute le pipeline complet et retourne les ScanMetrics"""
+        loop = asyncio.get_running_loop()
+        metrics = ScanMetrics()
+        metrics.addresses = len(addresses)
+        queues = [asyncio.Queue() for _ in self.stages]
+
+        workers = []
+        for index, (key, func, concurrency) in enumerate(self.stages):
+            outbox = queues[index + 1] if index + 1 < len(queues) else None
+            for _ in range(max(1, concurrency)):
+                workers.append(asyncio.create_task(
+                    self.stage_worker(key, func, queues[index], outbox, metrics)
+                ))
+
+        def on_reply(ip, rtt):
+            # Appelé depuis le thread de sonde
+            def push():
+                metrics.alive += 1
+                queues[0].put_nowait({'ip': ip, 'rtt': rtt})
+            loop.call_soon_threadsafe(push)
+
+        def on_probed(count):
+            def update():
+                metrics.probed = max(metrics.probed, count)
+                self.report_progress(metrics)
+            loop.call_soon_threadsafe(update)
+
+        try:
+            await loop.run_in_executor(
+                None,
+                lambda: self.probe.sweep(addresses, timeout=timeout, cancel=self.cancel,
+                                         on_reply=on_reply, on_probed=on_probed)
+            )
+            # Laisse passer les derniers call_soon_threadsafe
+            await asyncio.sleep(0)
+            metrics.probe_done = True
+            self.report_progress(metrics)
+            for queue in queues:
+                await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self.executor.shutdown(wait=False)
+
+        metrics.finish()
+        return metrics
@@ -0,0 +1,157 @@
+"""
+Planification des balayages réseau
+Réseaux réels de chaque interface (`ip -j addr`), réseaux ajoutés par
+l'utilisateur et exclusions; les plages sont dédoublonnées puis découpées en
+lots entrelacés (chaque réseau progresse en même temps).
+"""
+
+import ipaddress
+import json
+import os
+import socket
+import subprocess
+from itertools import islice, zip_longest
+
+# Interfaces virtuelles ignorées par défaut (conteneurs, ponts de VM)
+IGNORED_INTERFACES = ('lo', 'docker', 'br-', 'veth', 'virbr', 'vmnet', 'cni', 'flannel')
+
+# Un réseau d'interface plus large est réduit au sous-réseau de cette taille
+# contenant l'adresse locale (un /8 d'entreprise n'est pas balayé en entier)
+MAX_INTERFACE_PREFIX = int(os.getenv('RADAR_MAX_PREFIX', '20'))
+MAX_HOSTS = int(os.getenv('RADAR_MAX_HOSTS', '65536'))
+BATCH_SIZE = int(os.getenv('RADAR_BATCH_SIZE', '1024'))
+
+
+def parse_networks(value):
+    """'10.0.0.0/20, 192.168.1.5' -> [IPv4Network] (une IP seule = /32)"""
+    networks = []
+    for part in (value or '').replace(';', ',').split(','):
+        part = part.strip()
+        if part:
+            networks.append(ipaddress.ip_network(part, strict=False))
+    return networks
+
+
+def clamp_network(interface):
+    """Réseau de l'interface, réduit à MAX_INTERFACE_PREFIX autour de l'adresse locale"""
+    network = interface.network
+    if network.prefixlen < MAX_INTERFACE_PREFIX:
+        network = ipaddress.ip_interface(f"{interface.ip}/{MAX_INTERFACE_PREFIX}").network
+    return network
+
+
+def read_ip_json():
+    """Adresses IPv4 globales des interfaces actives via `ip -j addr`"""
+    result = subprocess.run(['ip', '-j', 'addr', 'show'], capture_output=True, text=True, timeout=5)
+    interfaces = []
+    for link in json.loads(result.stdout or '[]'):
+        name = link.get('ifname', '')
+        if name.startswith(IGNORED_INTERFACES) or link.get('operstate') == 'DOWN':
+            continue
+        for addr in link.get('addr_info', []):
+            if addr.get('family') == 'inet' and addr.get('scope') == 'global':
+                interfaces.append((name, ipaddress.ip_interface(f"{addr['local']}/{addr['prefixlen']}")))
+    return interfaces
+
+
+def default_route_interface():
+    """Adresse de sortie par défaut, en /24 (repli sans `ip`, ex. Windows)"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.connect(("8.8.8.8", 80))
+        return [('default', ipaddress.ip_interface(f"{sock.getsockname()[0]}/24"))]
+    finally:
+        sock.close()
+
+
+def local_interfaces():
+    """[(nom, IPv4Interface)] des interfaces locales"""
+    try:
+        interfaces = read_ip_json()
+        if interfaces:
+            return interfaces
+    except (OSError, ValueError, subprocess.SubprocessError):
+        pass
+    try:
+        return default_route_interface()
+    except OSError:
+        return []
+
+
+class ScanPlan:
+    """Réseaux à balayer, exclusions et découpage en lots"""
+
+    def __init__(self, networks, exclude=None, local_addresses=None):
+        self.networks = list(ipaddress.collapse_addresses(
+            n for n in networks if n.version == 4
+        ))
+        self.exclude = list(exclude or [])
+        # Nos propres adresses ne sont pas sondées
+        self.local_addresses = set(local_addresses or [])
+
+    def __len__(self):
+        return sum(max(1, n.num_addresses - 2) if n.prefixlen < 31 else n.num_addresses
+                   for n in self.networks)
+
+    def describe(self):
+        """Résumé court pour l'affichage ('10.0.0.0/20 +1')"""
+        if not self.networks:
+            return "aucun réseau"
+        extra = f" +{len(self.networks) - 1}" if len(self.networks) > 1 else ""
+        return f"{self.networks[0]}{extra}"
+
+    def excluded(self, ip):
+        return ip in self.local_addresses or any(ip in network for network in self.exclude)
+
+    def network_hosts(self, network):
+        if network.prefixlen >= 31:
+            return iter(network)  # /31 et /32: toutes les adresses sont des hôtes
+        return network.hosts()
+
+    def hosts(self):
+        """Adresses à sonder, entrelacées entre les réseaux (chaîne)"""
+        iterators = [self.network_hosts(n) for n in self.networks]
+        for group in zip_longest(*iterators):
+            for ip in group:
+                if ip is not None and not self.excluded(ip):
+                    yield str(ip)
+
+    def batches(self, size=BATCH_SIZE):
+        """Lots d'au plus `size` adresses"""
+        hosts = self.hosts()
+        while True:
+            batch = list(islice(hosts, size))
+            if not batch:
+                return
+            yield batch
+
+    def estimate(self, rate, timeout, size=BATCH_SIZE):
+        """Durée prévisible d'un balayage (envoi au débit `rate` + attente par lot)"""
+        count = len(self)
+        sending = count / rate if rate else 0
+        return sending + timeout * max(1, -(-count // size))
+
+
+def plan_scan(cidrs=None, exclude=None, interfaces=True, default=None):
+    """Construit le plan: interfaces locales + CIDR utilisateur - exclusions
+
+    cidrs/exclude: chaîne 'a/b,c/d' ou liste; par défaut RADAR_CIDRS et
+    RADAR_EXCLUDE. `default` (CIDR) est utilisé si rien d'autre n'est trouvé.
+    """
+    if cidrs is None:
+        cidrs = os.getenv('RADAR_CIDRS', '')
+    if exclude is None:
+        exclude = os.getenv('RADAR_EXCLUDE', '')
+    networks = parse_networks(cidrs) if isinstance(cidrs, str) else list(cidrs)
+    exclusions = parse_networks(exclude) if isinstance(exclude, str) else list(exclude)
+
+    local = local_interfaces()
+    if interfaces and os.getenv('RADAR_INTERFACES', '1') != '0':
+        networks += [clamp_network(interface) for _, interface in local]
+    if not networks and default:
+        networks.append(ipaddress.ip_network(default, strict=False))
+
+    plan = ScanPlan(networks, exclusions, {interface.ip for _, interface in local})
+    if len(plan) > MAX_HOSTS:
+        raise ValueError(f"{len(plan)} adresses à balayer (max {MAX_HOSTS}, RADAR_MAX_HOSTS)")
+    return plan
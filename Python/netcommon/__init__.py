@@ -0,0 +1,4 @@
+"""
+Modules communs à NetworkRadar et BoatBoard (une seule copie par module)
+Les scripts de chaque outil ajoutent le dossier Python/ au chemin d'import.
+"""
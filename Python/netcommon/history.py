@@ -0,0 +1,249 @@
+"""
+Historique des métriques et de la présence des appareils (SQLite)
+Écritures mises en file et insérées par lots depuis un thread dédié (mode
+WAL), agrégation automatique en buckets 1 min / 1 h (min, max, somme,
+nombre) et purge selon la rétention de chaque résolution.
+"""
+
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    series TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS samples_series_ts ON samples (series, ts);
+CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts);
+CREATE TABLE IF NOT EXISTS rollups (
+    series TEXT NOT NULL,
+    res INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    vmin REAL NOT NULL,
+    vmax REAL NOT NULL,
+    vsum REAL NOT NULL,
+    PRIMARY KEY (series, res, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS rollups_res_ts ON rollups (res, ts);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Résolutions agrégées (secondes) et rétention par défaut (secondes)
+RESOLUTIONS = (60, 3600)
+DEFAULT_RETENTION = {0: 24 * 3600, 60: 30 * 86400, 3600: 365 * 86400}
+
+
+class HistoryStore:
+    """Série temporelle embarquée: record() ne bloque jamais l'appelant"""
+
+    def __init__(self, path, retention=None, flush_interval=1.0, batch_size=1000,
+                 max_queue=100_000, maintenance_interval=60, run_blocking=None):
+        self.path = path
+        # Exécute les écritures SQLite (appels C bloquants); sous gevent, le
+        # thread d'écriture est une greenlet: à déléguer à un thread système
+        self.run_blocking = run_blocking or (lambda func, *args: func(*args))
+        self.retention = dict(DEFAULT_RETENTION, **(retention or {}))
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.maintenance_interval = maintenance_interval
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.local = threading.local()
+        self.dropped = 0
+        self.stopped = threading.Event()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        conn.commit()
+
+        self.thread = threading.Thread(target=self._writer, name='history-writer', daemon=True)
+        self.thread.start()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _reader(self):
+        """Connexion de lecture propre à chaque thread (lectures concurrentes en WAL)"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = self._connect()
+        return conn
+
+    # --- Écriture -------------------------------------------------------
+
+    def record(self, series, value, ts=None):
+        """Ajoute un point; perdu (et compté) si la file est pleine"""
+        if value is None:
+            return
+        try:
+            self.queue.put_nowait((series, int(ts if ts is not None else time.time()), float(value)))
+        except queue.Full:
+            self.dropped += 1
+
+    def record_many(self, values, ts=None):
+        """Ajoute plusieurs séries au même instant ({série: valeur})"""
+        ts = int(ts if ts is not None else time.time())
+        for series, value in values.items():
+            self.record(series, value, ts)
+
+    def _writer(self):
+        conn = self._connect()
+        batch = []
+        next_flush = time.monotonic() + self.flush_interval
+        next_maintenance = time.monotonic() + self.maintenance_interval
+        while not self.stopped.is_set() or not self.queue.empty():
+            timeout = max(0, next_flush - time.monotonic())
+            try:
+                batch.append(self.queue.get(timeout=timeout))
+                # Vide la file sans attendre jusqu'à la taille de lot
+                while len(batch) < self.batch_size:
+                    batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            if batch and (len(batch) >= self.batch_size or now >= next_flush):
+                self.run_blocking(self._flush, conn, batch)
+                batch = []
+            if now >= next_flush:
+                next_flush = now + self.flush_interval
+            if now >= next_maintenance:
+                self.run_blocking(self._maintenance, conn)
+                next_maintenance = now + self.maintenance_interval
+        if batch:
+            self.run_blocking(self._flush, conn, batch)
+        conn.close()
+
+    def _flush(self, conn, batch):
+        try:
+            with conn:
+                conn.executemany('INSERT INTO samples (series, ts, value) VALUES (?, ?, ?)', batch)
+        except sqlite3.Error as e:
+            logger.error(f"Erreur écriture historique: {e}")
+
+    def _maintenance(self, conn):
+        """Agrège les buckets terminés puis purge selon la rétention"""
+        now = int(time.time())
+        # Marge pour les points encore en file au moment de l'agrégation
+        settled = now - int(max(5, 2 * self.flush_interval))
+        try:
+            with conn:
+                source_res = 0
+                for res in RESOLUTIONS:
+                    key = f'rollup_{res}'
+                    row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+                    # Le dernier bucket agrégé est recalculé (points arrivés en retard)
+                    since = max(0, row[0] - res) if row else 0
+                    until = settled - settled % res  # buckets complets uniquement
+                    if until > since:
+                        if source_res == 0:
+                            conn.execute(
+                                'INSERT OR REPLACE INTO rollups (series, res, ts, n, vmin, vmax, vsum) '
+                                'SELECT series, ?, ts - ts % ?, COUNT(*), MIN(value), MAX(value), SUM(value) '
+                                'FROM samples WHERE ts >= ? AND ts < ? GROUP BY series, ts - ts % ?',
+                                (res, res, since, until, res)
+                            )
+                        else:
+                            conn.execute(
+                                'INSERT OR REPLACE INTO rollups (series, res, ts, n, vmin, vmax, vsum) '
+                                'SELECT series, ?, ts - ts % ?, SUM(n), MIN(vmin), MAX(vmax), SUM(vsum) '
+                                'FROM rollups WHERE res = ? AND ts >= ? AND ts < ? GROUP BY series, ts - ts % ?',
+                                (res, res, source_res, since, until, res)
+                            )
+                        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, until))
+                    source_res = res
+
+                conn.execute('DELETE FROM samples WHERE ts < ?', (now - self.retention[0],))
+                for res in RESOLUTIONS:
+                    conn.execute('DELETE FROM rollups WHERE res = ? AND ts < ?',
+                                 (res, now - self.retention[res]))
+        except sqlite3.Error as e:
+            logger.error(f"Erreur maintenance historique: {e}")
+
+    # --- Lecture --------------------------------------------------------
+
+    def pick_resolution(self, start, step):
+        """Résolution la plus grossière compatible avec le pas et couvrant la plage"""
+        age = time.time() - start
+        covering = [res for res in (0,) + RESOLUTIONS if age <= self.retention[res]]
+        covering = covering or [RESOLUTIONS[-1]]
+        aligned = [res for res in covering if res <= step and (res == 0 or step % res == 0)]
+        return max(aligned) if aligned else covering[0]
+
+    def _watermark(self, conn, res):
+        row = conn.execute('SELECT value FROM meta WHERE key = ?', (f'rollup_{res}',)).fetchone()
+        return row[0] if row else 0
+
+    def _aggregate(self, conn, series, res, start, end, step, buckets):
+        """Cumule (min, max, somme, n) par bucket; la fin de plage pas encore
+        agrégée est lue à la résolution plus fine"""
+        if res:
+            watermark = self._watermark(conn, res)
+            if watermark < end:
+                finer = (0,) + RESOLUTIONS
+                finer = finer[finer.index(res) - 1]
+                self._aggregate(conn, series, finer, max(start, watermark), end, step, buckets)
+                end = watermark
+        if start >= end:
+            return
+        if res == 0:
+            rows = conn.execute(
+                'SELECT ts - ts % ? AS bucket, MIN(value), MAX(value), SUM(value), COUNT(*) '
+                'FROM samples WHERE series = ? AND ts >= ? AND ts < ? GROUP BY bucket',
+                (step, series, start, end)
+            )
+        else:
+            rows = conn.execute(
+                'SELECT ts - ts % ? AS bucket, MIN(vmin), MAX(vmax), SUM(vsum), SUM(n) '
+                'FROM rollups WHERE series = ? AND res = ? AND ts >= ? AND ts < ? GROUP BY bucket',
+                (step, series, res, start, end)
+            )
+        for bucket, vmin, vmax, vsum, n in rows:
+            current = buckets.get(bucket)
+            if current is None:
+                buckets[bucket] = [vmin, vmax, vsum, n]
+            else:
+                current[0] = min(current[0], vmin)
+                current[1] = max(current[1], vmax)
+                current[2] += vsum
+                current[3] += n
+
+    def query(self, series, start, end, step):
+        """Buckets [{ts, min, max, avg, n}] de `step` secondes entre start et end"""
+        step = max(1, int(step))
+        start, end = int(start), int(end)
+        buckets = {}
+        self._aggregate(self._reader(), series, self.pick_resolution(start, step),
+                        start, end, step, buckets)
+        return [
+            {'ts': bucket, 'min': vmin, 'max': vmax, 'avg': round(vsum / n, 3), 'n': n}
+            for bucket, (vmin, vmax, vsum, n) in sorted(buckets.items())
+        ]
+
+    def series(self, prefix=''):
+        """Noms des séries connues (optionnellement filtrés par préfixe)"""
+        conn = self._reader()
+        rows = conn.execute(
+            'SELECT DISTINCT series FROM samples WHERE series >= ? AND series < ? '
+            'UNION SELECT DISTINCT series FROM rollups WHERE series >= ? AND series < ?',
+            (prefix, prefix + '￿', prefix, prefix + '￿')
+        ).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def close(self):
+        self.stopped.set()
+        self.thread.join(timeout=5)
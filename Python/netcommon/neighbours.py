@@ -0,0 +1,125 @@
+"""
+Lecture de la table des voisins (cache ARP du noyau)
+Une seule lecture groupée par cycle de scan au lieu d'un appel `arp` par IP.
+"""
+
+import platform
+import re
+import subprocess
+import threading
+import time
+
+PROC_NET_ARP = '/proc/net/arp'
+PROC_NET_ROUTE = '/proc/net/route'
+ATF_COM = 0x2  # entrée complète
+
+_ARP_LINE = re.compile(
+    r'(\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3})\D+?((?:[0-9a-f]{1,2}[:-]){5}[0-9a-f]{1,2})',
+    re.IGNORECASE
+)
+
+
+def normalize_mac(mac):
+    """aa:bb:cc:dd:ee:ff en minuscules (accepte '-' et les zéros omis de macOS)"""
+    return ':'.join(part.zfill(2) for part in re.split(r'[:-]', mac.lower()))
+
+
+def read_proc_arp(path=PROC_NET_ARP):
+    """Parse /proc/net/arp et retourne {ip: (mac, interface)}"""
+    entries = {}
+    with open(path) as f:
+        next(f, None)  # en-tête
+        for line in f:
+            parts = line.split()
+            if len(parts) < 6:
+                continue
+            ip, _, flags, mac, _, device = parts[:6]
+            if not int(flags, 16) & ATF_COM or mac == '00:00:00:00:00:00':
+                continue
+            entries[ip] = (mac.lower(), device)
+    return entries
+
+
+def default_interface(path=PROC_NET_ROUTE):
+    """Interface de la route par défaut (Linux), None si inconnue"""
+    try:
+        with open(path) as f:
+            next(f, None)  # en-tête
+            for line in f:
+                parts = line.split()
+                if len(parts) > 1 and parts[1] == '00000000':
+                    return parts[0]
+    except OSError:
+        pass
+    return None
+
+
+def read_arp_command():
+    """Repli hors Linux: un seul `arp -a` pour toute la table"""
+    entries = {}
+    result = subprocess.run(['arp', '-a'], capture_output=True, text=True, timeout=5)
+    for line in result.stdout.split('\n'):
+        match = _ARP_LINE.search(line)
+        if match:
+            ip, mac = match.groups()
+            mac = normalize_mac(mac)
+            if mac not in ('ff:ff:ff:ff:ff:ff', '00:00:00:00:00:00'):
+                entries[ip] = (mac, '')
+    return entries
+
+
+class NeighbourTable:
+    """Index IP -> MAC construit à partir d'une lecture groupée de la table du noyau"""
+
+    def __init__(self, max_age=1.0, min_refresh=None):
+        self.use_proc = platform.system() == 'Linux'
+        self.max_age = max_age  # âge max d'un instantané avant relecture
+        # Délai min entre deux relectures sur absence (un `arp -a` hors Linux coûte cher)
+        self.min_refresh = min_refresh if min_refresh is not None else (0.1 if self.use_proc else 1.0)
+        self.entries = {}
+        self.updated = 0.0
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+
+    def refresh(self):
+        """Relit toute la table et retourne l'index {ip: mac}"""
+        try:
+            if self.use_proc:
+                entries = read_proc_arp()
+            else:
+                entries = read_arp_command()
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"Erreur lecture table ARP: {e}")
+            entries = {}
+        with self.lock:
+            self.entries = entries
+            self.updated = time.monotonic()
+        return self.snapshot()
+
+    def snapshot(self):
+        """Index {ip: mac} du dernier instantané"""
+        with self.lock:
+            return {ip: mac for ip, (mac, _) in self.entries.items()}
+
+    def refresh_if_older(self, max_age):
+        """Relit la table si l'instantané a plus de max_age secondes
+
+        Une seule relecture à la fois: les appelants concurrents (étape MAC du
+        pipeline) réutilisent l'instantané lu par le premier.
+        """
+        with self.refresh_lock:
+            if time.monotonic() - self.updated > max_age:
+                self.refresh()
+
+    def lookup(self, ip):
+        """MAC d'une IP, relit la table si l'instantané est trop ancien"""
+        self.refresh_if_older(self.max_age)
+        with self.lock:
+            entry = self.entries.get(ip)
+        if entry is None:
+            # L'entrée a pu apparaître depuis la dernière lecture (au plus une
+            # relecture par min_refresh, quel que soit le nombre d'absences)
+            self.refresh_if_older(self.min_refresh)
+            with self.lock:
+                entry = self.entries.get(ip)
+        return entry[0] if entry else None
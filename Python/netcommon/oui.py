@@ -0,0 +1,206 @@
+"""
+Base des fabricants IEEE (OUI / MA-M / MA-S) avec index précompilé
+Les registres CSV de l'IEEE sont compilés une fois dans un index binaire
+(marshal) rechargé en quelques millisecondes; la recherche se fait par
+préfixe 36, 28 puis 24 bits dans des dictionnaires (temps constant).
+
+Mise à jour des registres: python -m netcommon.oui --update
+"""
+
+import csv
+import marshal
+import os
+import sys
+import threading
+import urllib.request
+
+INDEX_VERSION = 1
+INDEX_FILE = 'oui.idx'
+
+# (fichier, nombre de bits du préfixe, URL du registre IEEE)
+REGISTRIES = [
+    ('oui36.csv', 36, 'https://standards-oui.ieee.org/oui36/oui36.csv'),
+    ('mam.csv', 28, 'https://standards-oui.ieee.org/oui28/mam.csv'),
+    ('oui.csv', 24, 'https://standards-oui.ieee.org/oui/oui.csv'),
+]
+
+# Table minimale utilisée tant qu'aucun registre n'est installé
+BUILTIN_VENDORS = {
+    '001A11': 'Google',
+    '0050F2': 'Microsoft',
+    'DCA632': 'Raspberry Pi',
+    'B827EB': 'Raspberry Pi',
+    'D83ADD': 'Raspberry Pi',
+    'E45F01': 'Raspberry Pi',
+    '28CDC1': 'Raspberry Pi',
+    '000A95': 'Apple',
+    '001B63': 'Apple',
+    '28CDC4': 'Apple',
+    '001EC2': 'Apple',
+    'ACDE48': 'Apple',
+    '001F3C': 'Samsung',
+    '0015B9': 'TP-Link',
+    '00059A': 'Cisco',
+    'E84E06': 'TP-Link',
+    '50C7BF': 'TP-Link',
+    'A036BC': 'D-Link',
+    '001D0F': 'Dell',
+    '00237D': 'Huawei',
+    '005056': 'VMware',
+    '000C29': 'VMware',
+    '000569': 'VMware',
+    '080027': 'VirtualBox',
+    '525400': 'QEMU',
+    '001132': 'Synology',
+    '00089B': 'QNAP',
+}
+
+
+def default_data_dir():
+    return os.getenv('OUI_DATA_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'oui'))
+
+
+def mac_to_int(mac):
+    """aa:bb:cc:dd:ee:ff (ou aa-bb-..., aabb.ccdd...) -> entier 48 bits, None si invalide"""
+    digits = ''.join(c for c in mac if c not in ':-. ')
+    if len(digits) != 12:
+        return None
+    try:
+        return int(digits, 16)
+    except ValueError:
+        return None
+
+
+class OuiDatabase:
+    """Index fabricants par préfixe, chargé paresseusement à la première recherche"""
+
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir or default_data_dir()
+        self.vendors = []  # noms dédupliqués
+        self.tables = {}  # bits -> {préfixe: index dans vendors}
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def sources(self):
+        """Registres CSV présents et leur signature (taille, mtime)"""
+        found = []
+        for filename, bits, _ in REGISTRIES:
+            path = os.path.join(self.data_dir, filename)
+            if os.path.exists(path):
+                stat = os.stat(path)
+                found.append((filename, bits, stat.st_size, int(stat.st_mtime)))
+        return found
+
+    def load(self):
+        if self.loaded:
+            return
+        with self.lock:
+            if self.loaded:
+                return
+            sources = self.sources()
+            if sources and not self.load_index(sources):
+                self.compile(sources)
+                self.save_index(sources)
+            if not self.tables:
+                self.load_builtin()
+            self.loaded = True
+
+    def load_index(self, sources):
+        path = os.path.join(self.data_dir, INDEX_FILE)
+        try:
+            with open(path, 'rb') as f:
+                version, signature, vendors, tables = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return False
+        if version != INDEX_VERSION or signature != sources:
+            return False
+        self.vendors, self.tables = vendors, tables
+        return True
+
+    def save_index(self, sources):
+        path = os.path.join(self.data_dir, INDEX_FILE)
+        try:
+            tmp = path + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(marshal.dumps((INDEX_VERSION, sources, self.vendors, self.tables)))
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠ Index OUI non sauvegardé: {e}")
+
+    def compile(self, sources):
+        """Parse les CSV IEEE (Registry,Assignment,Organization Name,...)"""
+        interned = {}
+        tables = {}
+        for filename, bits, _, _ in sources:
+            table = tables.setdefault(bits, {})
+            with open(os.path.join(self.data_dir, filename), newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                for row in reader:
+                    if len(row) < 3:
+                        continue
+                    try:
+                        prefix = int(row[1], 16)
+                    except ValueError:
+                        continue
+                    name = row[2].strip()
+                    table[prefix] = interned.setdefault(name, len(interned))
+        self.vendors = list(interned)
+        self.tables = tables
+
+    def load_builtin(self):
+        self.vendors = sorted(set(BUILTIN_VENDORS.values()))
+        index = {name: i for i, name in enumerate(self.vendors)}
+        self.tables = {24: {int(prefix, 16): index[name] for prefix, name in BUILTIN_VENDORS.items()}}
+
+    def lookup(self, mac):
+        """Fabricant d'une adresse MAC, None si inconnu"""
+        value = mac_to_int(mac)
+        if value is None:
+            return None
+        self.load()
+        for bits in (36, 28, 24):
+            table = self.tables.get(bits)
+            if table:
+                vendor = table.get(value >> (48 - bits))
+                if vendor is not None:
+                    return self.vendors[vendor]
+        return None
+
+    def update(self):
+        """Télécharge les registres IEEE et recompile l'index"""
+        os.makedirs(self.data_dir, exist_ok=True)
+        for filename, _, url in REGISTRIES:
+            print(f"Téléchargement {url}...")
+            request = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
+            with urllib.request.urlopen(request, timeout=60) as response:
+                data = response.read()
+            tmp = os.path.join(self.data_dir, filename + '.tmp')
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, os.path.join(self.data_dir, filename))
+        with self.lock:
+            sources = self.sources()
+            self.compile(sources)
+            self.save_index(sources)
+            self.loaded = True
+        print(f"✓ {sum(len(t) for t in self.tables.values())} préfixes indexés")
+
+
+_default = None
+
+
+def lookup_vendor(mac):
+    """Recherche dans la base par défaut (OUI_DATA_DIR ou ./oui)"""
+    global _default
+    if _default is None:
+        _default = OuiDatabase()
+    return _default.lookup(mac)
+
+
+if __name__ == '__main__':
+    if '--update' in sys.argv:
+        OuiDatabase().update()
+    else:
+        for arg in sys.argv[1:]:
+            print(arg, lookup_vendor(arg) or 'Inconnu')
@@ -0,0 +1,274 @@
+"""
+Découverte passive des appareils (ARP, mDNS, DHCP)
+Une socket AF_PACKET filtrée en BPF par le noyau (ARP et UDP 67/68/5353
+uniquement) écoute le trafic du segment: nouveaux appareils et noms d'hôte
+sont signalés en temps réel, sans aucun paquet émis.
+"""
+
+import ctypes
+import socket
+import struct
+import threading
+import time
+
+from netcommon.neighbours import default_interface
+
+ETH_P_ALL = 0x0003
+ETH_P_ARP = 0x0806
+ETH_P_IP = 0x0800
+PACKET_OUTGOING = 4
+SO_ATTACH_FILTER = 26
+
+DHCP_PORTS = (67, 68)
+MDNS_PORT = 5353
+DHCP_MAGIC = b'\x63\x82\x53\x63'
+
+# Programme BPF: "arp or (udp and not fragment and port 67/68/5353)"
+# (code, saut si vrai, saut si faux, constante); sauts relatifs à l'instruction suivante
+BPF_FILTER = [
+    (0x28, 0, 0, 12),          # ldh [12]              type Ethernet
+    (0x15, 14, 0, ETH_P_ARP),  # jeq ARP -> accepte
+    (0x15, 0, 14, ETH_P_IP),   # jeq IPv4 sinon rejette
+    (0x30, 0, 0, 23),          # ldb [23]              protocole IP
+    (0x15, 0, 12, 17),         # jeq UDP sinon rejette
+    (0x28, 0, 0, 20),          # ldh [20]              fragment
+    (0x45, 10, 0, 0x1FFF),     # jset -> rejette
+    (0xB1, 0, 0, 14),          # ldxb 4*([14]&0xf)     longueur en-tête IP
+    (0x48, 0, 0, 14),          # ldh [x+14]            port source
+    (0x15, 6, 0, 67),
+    (0x15, 5, 0, 68),
+    (0x15, 4, 0, MDNS_PORT),
+    (0x48, 0, 0, 16),          # ldh [x+16]            port destination
+    (0x15, 2, 0, 67),
+    (0x15, 1, 0, 68),
+    (0x15, 0, 1, MDNS_PORT),
+    (0x06, 0, 0, 0x40000),     # accepte
+    (0x06, 0, 0, 0),           # rejette
+]
+
+
+def attach_filter(sock, program=BPF_FILTER):
+    """Installe le filtre BPF: le noyau ne remonte que les paquets utiles"""
+    code = b''.join(struct.pack('HBBI', *instruction) for instruction in program)
+    buffer = ctypes.create_string_buffer(code)
+    fprog = struct.pack('HL', len(program), ctypes.addressof(buffer))
+    sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+
+def format_mac(raw):
+    return ':'.join(f'{b:02x}' for b in raw)
+
+
+def parse_arp(payload):
+    """(ip, mac) de l'émetteur d'un paquet ARP"""
+    if len(payload) < 28:
+        return None
+    sender_mac, sender_ip = payload[8:14], payload[14:18]
+    if sender_ip == b'\x00\x00\x00\x00':
+        return None  # sonde ARP (RFC 5227): adresse pas encore attribuée
+    return socket.inet_ntoa(sender_ip), format_mac(sender_mac)
+
+
+def parse_dhcp(payload):
+    """(ip, mac, hostname) d'un message DHCP, None si incomplet"""
+    if len(payload) < 240 or payload[236:240] != DHCP_MAGIC:
+        return None
+    op = payload[0]
+    ciaddr, yiaddr = payload[12:16], payload[16:20]
+    mac = format_mac(payload[28:34])
+    options = {}
+    i = 240
+    while i < len(payload):
+        code = payload[i]
+        if code == 255:
+            break
+        if code == 0:
+            i += 1
+            continue
+        if i + 1 >= len(payload):
+            break
+        length = payload[i + 1]
+        options[code] = payload[i + 2:i + 2 + length]
+        i += 2 + length
+
+    hostname = None
+    if 12 in options:
+        hostname = options[12].decode('utf-8', errors='replace').strip('\x00') or None
+    elif 81 in options and len(options[81]) > 3:
+        # FQDN client (RFC 4702): 3 octets de drapeaux puis le nom
+        hostname = options[81][3:].decode('utf-8', errors='replace').split('.')[0] or None
+
+    ip = None
+    if op == 2 and options.get(53) == b'\x05':
+        ip = yiaddr  # DHCPACK: bail attribué
+    elif 50 in options and len(options[50]) == 4:
+        ip = options[50]  # adresse demandée
+    elif ciaddr != b'\x00\x00\x00\x00':
+        ip = ciaddr
+    ip = socket.inet_ntoa(ip) if ip and ip != b'\x00\x00\x00\x00' else None
+    if ip is None and hostname is None:
+        return None
+    return ip, mac, hostname
+
+
+def read_name(data, offset, depth=0):
+    """Nom DNS (avec compression) -> (nom, offset suivant)"""
+    labels = []
+    jumped_to = None
+    while offset < len(data) and depth < 16:
+        length = data[offset]
+        if length == 0:
+            offset += 1
+            break
+        if length & 0xC0 == 0xC0:
+            if offset + 1 >= len(data):
+                break
+            pointer = ((length & 0x3F) << 8) | data[offset + 1]
+            if jumped_to is None:
+                jumped_to = offset + 2
+            offset = pointer
+            depth += 1
+            continue
+        labels.append(data[offset + 1:offset + 1 + length].decode('utf-8', errors='replace'))
+        offset += 1 + length
+    return '.'.join(labels), (jumped_to if jumped_to is not None else offset)
+
+
+def parse_mdns(payload):
+    """{ip: nom} des enregistrements A d'une réponse mDNS"""
+    if len(payload) < 12:
+        return {}
+    flags, qdcount, ancount, nscount, arcount = struct.unpack('!2xHHHHH', payload[:12])
+    if not flags & 0x8000:
+        return {}  # requête: pas de nom annoncé
+    offset = 12
+    for _ in range(qdcount):
+        _, offset = read_name(payload, offset)
+        offset += 4
+    names = {}
+    for _ in range(ancount + nscount + arcount):
+        name, offset = read_name(payload, offset)
+        if offset + 10 > len(payload):
+            break
+        rtype, _, _, rdlength = struct.unpack('!HHIH', payload[offset:offset + 10])
+        offset += 10
+        if rtype == 1 and rdlength == 4 and name.endswith('.local'):
+            names[socket.inet_ntoa(payload[offset:offset + 4])] = name[:-len('.local')]
+        offset += rdlength
+    return names
+
+
+class PassiveListener:
+    """Écoute ARP/mDNS/DHCP; on_change(device) pour chaque appareil nouveau ou modifié"""
+
+    def __init__(self, interface=None, on_change=None):
+        # Interface de la route par défaut: sans bind, docker0 et les veth
+        # (network_mode: host) feraient apparaître les conteneurs comme appareils
+        self.interface = interface or default_interface()
+        self.on_change = on_change
+        self.devices = {}  # mac -> {'ip', 'mac', 'hostname', 'source', 'last_seen'}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.stats = {'packets': 0, 'arp': 0, 'dhcp': 0, 'mdns': 0}
+        self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+        attach_filter(self.sock)
+        if self.interface:
+            self.sock.bind((self.interface, ETH_P_ALL))
+        self.sock.settimeout(1.0)
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='passive-discovery', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Arrête l'écoute et libère la socket (recvfrom en cours interrompu)"""
+        self.stopped.set()
+        self.sock.close()
+
+    def recent(self, max_age):
+        """Copie des appareils vus depuis moins de max_age secondes"""
+        limit = time.time() - max_age
+        with self.lock:
+            return [dict(device) for device in self.devices.values()
+                    if device['ip'] and device['last_seen'] >= limit]
+
+    def hostname(self, mac):
+        """Nom annoncé en DHCP/mDNS pour cette MAC, None si inconnu"""
+        with self.lock:
+            device = self.devices.get(mac)
+            return device['hostname'] if device else None
+
+    def _run(self):
+        while not self.stopped.is_set():
+            try:
+                frame, address = self.sock.recvfrom(65535)
+            except socket.timeout:
+                continue
+            except OSError as e:
+                if not self.stopped.is_set():
+                    print(f"⚠ Écoute passive interrompue: {e}")
+                return
+            if address[2] == PACKET_OUTGOING:
+                continue  # nos propres paquets
+            try:
+                self.handle(frame)
+            except (ValueError, IndexError, struct.error):
+                pass  # paquet tronqué ou malformé
+
+    def handle(self, frame):
+        """Décode une trame Ethernet déjà filtrée"""
+        self.stats['packets'] += 1
+        ethertype = struct.unpack('!H', frame[12:14])[0]
+        if ethertype == ETH_P_ARP:
+            sender = parse_arp(frame[14:])
+            if sender:
+                self.stats['arp'] += 1
+                self.observe(sender[0], sender[1], None, 'arp')
+            return
+
+        header_length = (frame[14] & 0x0F) * 4
+        source_ip = socket.inet_ntoa(frame[26:30])
+        udp = frame[14 + header_length:]
+        source_port, destination_port = struct.unpack('!HH', udp[:4])
+        payload = udp[8:]
+        if source_port in DHCP_PORTS or destination_port in DHCP_PORTS:
+            result = parse_dhcp(payload)
+            if result:
+                self.stats['dhcp'] += 1
+                self.observe(*result, 'dhcp')
+        elif MDNS_PORT in (source_port, destination_port):
+            names = parse_mdns(payload)
+            if source_ip in names:
+                self.stats['mdns'] += 1
+                self.observe(source_ip, format_mac(frame[6:12]), names[source_ip], 'mdns')
+
+    def observe(self, ip, mac, hostname, source):
+        """Met à jour le registre; notifie seulement les nouveautés"""
+        now = time.time()
+        with self.lock:
+            device = self.devices.get(mac)
+            if device is None:
+                device = self.devices[mac] = {'ip': ip, 'mac': mac, 'hostname': hostname,
+                                              'source': source, 'last_seen': now}
+                changed = True
+            else:
+                changed = (ip and ip != device['ip']) or (hostname and hostname != device['hostname'])
+                device['ip'] = ip or device['ip']
+                device['hostname'] = hostname or device['hostname']
+                device['source'] = source
+                device['last_seen'] = now
+            snapshot = dict(device)
+        if changed and snapshot['ip'] and self.on_change:
+            self.on_change(snapshot)
+
+
+def create_passive_listener(interface=None, on_change=None):
+    """PassiveListener démarré, ou None (pas Linux, pas de CAP_NET_RAW...)"""
+    try:
+        listener = PassiveListener(interface, on_change)
+    except (OSError, AttributeError) as e:
+        print(f"⚠ Découverte passive indisponible ({e})")
+        return None
+    listener.start()
+    return listener
@@ -0,0 +1,124 @@
+"""
+Résolveur DNS inverse concurrent avec cache
+Pool de threads borné, cache LRU avec TTL positif/négatif et délai maximal
+par résolution.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+
+class ReverseResolver:
+    """Résolution PTR asynchrone; un PTR absent ne bloque jamais l'appelant"""
+
+    def __init__(self, workers=8, max_entries=4096, positive_ttl=3600,
+                 negative_ttl=300, timeout=2.0, max_pending=256):
+        self.max_entries = max_entries
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout  # délai max d'attente d'une résolution
+        self.max_pending = max_pending
+        self.cache = OrderedDict()  # ip -> (hostname ou None, expiration)
+        self.pending = {}  # ip -> Future en cours
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rdns')
+        self.stats = {'hits': 0, 'misses': 0, 'lookups': 0}
+
+    def _lookup(self, ip):
+        try:
+            return socket.gethostbyaddr(ip)[0]
+        except (socket.herror, socket.gaierror, OSError):
+            return None
+
+    def _store(self, ip, future):
+        # finally: une IP restée dans pending ne serait plus jamais résolue
+        try:
+            hostname = future.result() if not future.cancelled() else None
+            ttl = self.positive_ttl if hostname else self.negative_ttl
+            with self.lock:
+                self.cache[ip] = (hostname, time.monotonic() + ttl)
+                self.cache.move_to_end(ip)
+                while len(self.cache) > self.max_entries:
+                    self.cache.popitem(last=False)
+        finally:
+            with self.lock:
+                self.pending.pop(ip, None)
+
+    def cached(self, ip):
+        """Retourne (trouvé, hostname) sans jamais résoudre"""
+        with self.lock:
+            entry = self.cache.get(ip)
+            if entry is None or entry[1] < time.monotonic():
+                return False, None
+            self.cache.move_to_end(ip)
+            return True, entry[0]
+
+    def submit(self, ip):
+        """Lance la résolution si nécessaire et retourne le Future (None si saturé)"""
+        with self.lock:
+            future = self.pending.get(ip)
+            if future is not None:
+                return future
+            if len(self.pending) >= self.max_pending:
+                return None
+            future = self.executor.submit(self._lookup, ip)
+            self.pending[ip] = future
+            self.stats['lookups'] += 1
+        future.add_done_callback(lambda f: self._store(ip, f))
+        return future
+
+    def lookup_nowait(self, ip, default=None):
+        """Hostname en cache, sinon planifie la résolution et retourne default"""
+        found, hostname = self.cached(ip)
+        if found:
+            self.stats['hits'] += 1
+            return hostname or default
+        self.stats['misses'] += 1
+        self.submit(ip)
+        return default
+
+    def prefetch(self, ips):
+        """Planifie la résolution des IPs absentes du cache"""
+        for ip in ips:
+            if not self.cached(ip)[0]:
+                self.submit(ip)
+
+    def resolve(self, ip, timeout=None, default=None):
+        """Résolution bloquante bornée par le délai maximal"""
+        found, hostname = self.cached(ip)
+        if found:
+            self.stats['hits'] += 1
+            return hostname or default
+        self.stats['misses'] += 1
+        future = self.submit(ip)
+        if future is None:
+            return default
+        try:
+            return future.result(timeout=timeout or self.timeout) or default
+        except FutureTimeout:
+            return default
+
+    async def resolve_async(self, ip, timeout=None, default=None):
+        """Variante asyncio de resolve()"""
+        found, hostname = self.cached(ip)
+        if found:
+            self.stats['hits'] += 1
+            return hostname or default
+        self.stats['misses'] += 1
+        future = self.submit(ip)
+        if future is None:
+            return default
+        try:
+            # shield: la résolution continue et remplit le cache après le délai
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(future)), timeout or self.timeout
+            ) or default
+        except asyncio.TimeoutError:
+            return default
+
+    def close(self):
+        self.executor.shutdown(wait=False)